@@ -0,0 +1,6 @@
+# The stand-up questions the similarity report scores each participant against
+STANDUP_AGENDA = [
+    "What did you do yesterday?",
+    "What will you do today?",
+    "Are there any blockers or impediments?",
+]
@@ -0,0 +1,136 @@
+import logging
+import queue
+import threading
+import time
+
+class AudioPipeline:
+    """Continuous capture feeding a pool of recognition workers.
+
+    One thread keeps the microphone open and pushes each phrase, tagged with
+    a capture sequence number, into a bounded queue; when the queue is full
+    the new phrase is dropped and counted. Recognition workers consume the
+    queue in parallel and their results pass through a re-order buffer, so
+    on_text(text) always sees phrases in the order they were spoken.
+    """
+
+    def __init__(self, recognizer, microphone, on_text, workers=2, max_queue=8,
+                 listen_timeout=5, phrase_time_limit=10):
+        self.recognizer = recognizer
+        self.microphone = microphone
+        self.on_text = on_text
+        self.n_workers = workers
+        self.listen_timeout = listen_timeout
+        self.phrase_time_limit = phrase_time_limit
+        self.segments = queue.Queue(maxsize=max_queue)
+        self.stop_flag = threading.Event()
+        self.threads = []
+
+        self.lock = threading.Lock()
+        self.deliver_lock = threading.Lock()
+        self.next_seq = 0
+        self.next_to_deliver = 0
+        self.pending = {}
+        self.captured = 0
+        self.dropped = 0
+        self.recognized = 0
+        self.unrecognized = 0
+        self.errors = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+    def start(self):
+        self.stop_flag.clear()
+        self.threads = [threading.Thread(target=self._capture, daemon=True)]
+        self.threads += [threading.Thread(target=self._recognize, daemon=True) for _ in range(self.n_workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def stop(self, timeout=2):
+        self.stop_flag.set()
+        for thread in self.threads:
+            thread.join(timeout=timeout)
+
+    def _capture(self):
+        import speech_recognition as sr
+        with self.microphone as source:
+            self.recognizer.adjust_for_ambient_noise(source)
+            while not self.stop_flag.is_set():
+                try:
+                    audio = self.recognizer.listen(source, timeout=self.listen_timeout,
+                                                   phrase_time_limit=self.phrase_time_limit)
+                except sr.WaitTimeoutError:
+                    logging.debug("Listening timed out, no speech detected")
+                    continue
+                captured_at = time.monotonic()
+                with self.lock:
+                    try:
+                        self.segments.put_nowait((self.next_seq, captured_at, audio))
+                    except queue.Full:
+                        self.dropped += 1
+                        logging.warning(f"Recognition is behind; dropped a phrase ({self.dropped} so far)")
+                        continue
+                    self.next_seq += 1
+                    self.captured += 1
+
+    def _recognize(self):
+        import speech_recognition as sr
+        while not self.stop_flag.is_set():
+            try:
+                seq, captured_at, audio = self.segments.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            text = None
+            try:
+                text = self.recognizer.recognize_google(audio).lower()
+                logging.debug(f"Recognized #{seq}: {text}")
+            except sr.UnknownValueError:
+                logging.debug("Could not understand audio")
+                with self.lock:
+                    self.unrecognized += 1
+            except sr.RequestError as e:
+                logging.error(f"API error: {e}")
+                with self.lock:
+                    self.errors += 1
+            self._deliver(seq, captured_at, text)
+
+    def _deliver(self, seq, captured_at, text):
+        # Failed phrases still advance the sequence so later results are not held back.
+        # on_text runs outside self.lock (stats() takes it from the Tk thread); the
+        # delivery lock keeps the workers handing texts over in spoken order
+        with self.deliver_lock:
+            ready = []
+            with self.lock:
+                self.pending[seq] = (captured_at, text)
+                while self.next_to_deliver in self.pending:
+                    captured_at, text = self.pending.pop(self.next_to_deliver)
+                    self.next_to_deliver += 1
+                    if text is None:
+                        continue
+                    self.recognized += 1
+                    self.last_lag = time.monotonic() - captured_at
+                    self.max_lag = max(self.max_lag, self.last_lag)
+                    ready.append(text)
+            for text in ready:
+                try:
+                    self.on_text(text)
+                except Exception as e:
+                    logging.error(f"Error handling recognized text: {e}")
+
+    def stats(self):
+        with self.lock:
+            return {
+                "queue_depth": self.segments.qsize(),
+                "reorder_pending": len(self.pending),
+                "captured": self.captured,
+                "dropped": self.dropped,
+                "recognized": self.recognized,
+                "unrecognized": self.unrecognized,
+                "errors": self.errors,
+                "last_lag": self.last_lag,
+                "max_lag": self.max_lag,
+            }
+
+    def stats_text(self):
+        s = self.stats()
+        return (f"ASR queue {s['queue_depth']} (reorder {s['reorder_pending']}), dropped {s['dropped']}, "
+                f"lag {s['last_lag']:.1f}s (max {s['max_lag']:.1f}s)")
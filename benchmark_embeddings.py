@@ -0,0 +1,119 @@
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from agenda import STANDUP_AGENDA
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def load_corpus(limit):
+    lines = []
+    with open(os.path.join(HERE, "category_labeled.csv"), newline="") as f:
+        for row in csv.DictReader(f):
+            text = row["text"]
+            # Drop the "Speaker: " prefix used in the labeled data
+            lines.append(text.split(":", 1)[1].strip() if ":" in text[:30] else text)
+            if len(lines) >= limit:
+                break
+    return lines
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def child(backend_name, corpus_size, repeats, out_path):
+    # One backend per process so RSS and load time are not polluted by the others
+    sys.path.insert(0, HERE)
+    os.chdir(HERE)
+    from similarity import load_backend
+    corpus = load_corpus(corpus_size)
+    rss_before = rss_mb()
+    t0 = time.perf_counter()
+    backend = load_backend(backend_name)
+    backend.encode(["warm up"])
+    load_time = time.perf_counter() - t0
+
+    latencies = []
+    for i in range(repeats):
+        t = time.perf_counter()
+        backend.encode([corpus[i % len(corpus)]])
+        latencies.append(time.perf_counter() - t)
+
+    t = time.perf_counter()
+    embeddings = np.asarray(backend.encode(corpus), dtype=np.float32)
+    batch_time = time.perf_counter() - t
+    agenda = np.asarray(backend.encode(STANDUP_AGENDA), dtype=np.float32)
+    np.save(out_path, np.concatenate([embeddings, agenda]))
+
+    latencies.sort()
+    print(json.dumps({
+        "load_s": load_time,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        "throughput": len(corpus) / batch_time,
+        "rss_mb": rss_mb(),
+        "model_rss_mb": rss_mb() - rss_before,
+    }))
+
+def agenda_scores(vectors, n_agenda):
+    lines, agenda = vectors[:-n_agenda], vectors[-n_agenda:]
+    lines = lines / np.linalg.norm(lines, axis=1, keepdims=True)
+    agenda = agenda / np.linalg.norm(agenda, axis=1, keepdims=True)
+    return lines @ agenda.T
+
+def main(backends, corpus_size, repeats):
+    results, vectors = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in backends:
+            out_path = os.path.join(tmp, f"{name}.npy")
+            proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", name,
+                                   "--corpus", str(corpus_size), "--repeats", str(repeats), "--out", out_path],
+                                  capture_output=True, text=True)
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()
+                print(f"{name}: failed ({error[-1] if error else proc.returncode})")
+                continue
+            results[name] = json.loads(proc.stdout.strip().splitlines()[-1])
+            vectors[name] = np.load(out_path)
+
+    print(f"{'backend':<10} {'load s':>8} {'p50 ms':>8} {'p99 ms':>8} {'lines/s':>9} {'RSS MB':>8} {'model MB':>9}")
+    for name, r in results.items():
+        print(f"{name:<10} {r['load_s']:8.2f} {r['p50_ms']:8.2f} {r['p99_ms']:8.2f} "
+              f"{r['throughput']:9.1f} {r['rss_mb']:8.1f} {r['model_rss_mb']:9.1f}")
+
+    if "torch" in vectors:
+        reference = agenda_scores(vectors["torch"], len(STANDUP_AGENDA))
+        for name, v in vectors.items():
+            if name == "torch":
+                continue
+            scores = agenda_scores(v, len(STANDUP_AGENDA))
+            same_item = (scores.argmax(axis=1) == reference.argmax(axis=1)).mean()
+            print(f"{name} vs torch: max |similarity diff| {np.abs(scores - reference).max():.4f}, "
+                  f"same best agenda item for {same_item * 100:.1f}% of lines")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare embedding backends: latency, throughput, RSS and score agreement.")
+    parser.add_argument("--backends", default="torch,onnx-fp32,onnx")
+    parser.add_argument("--corpus", type=int, default=500, help="number of lines from category_labeled.csv")
+    parser.add_argument("--repeats", type=int, default=200, help="single-sentence calls for the latency percentiles")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child, args.corpus, args.repeats, args.out)
+    else:
+        main(args.backends.split(","), args.corpus, args.repeats)
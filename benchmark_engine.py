@@ -0,0 +1,89 @@
+import argparse
+import logging
+import statistics
+import time
+
+from meeting_engine import MeetingEngine
+from scheduler import Scheduler
+
+NAMES = ["alice", "bob", "carol", "dave", "eve", "frank", "grace", "heidi", "ivan", "judy"]
+
+STATUS_LINES = [
+    "yesterday i fixed bugs reported by qa",
+    "today i will deploy the new release to staging",
+    "blocked by database connectivity issues",
+]
+
+def meeting_script(participants, lines_per_speaker):
+    script = []
+    for name in participants:
+        script.append(f"{name}, you can start")
+        for i in range(lines_per_speaker):
+            script.append(STATUS_LINES[i % len(STATUS_LINES)])
+        script.append("that's all from me")
+    return script
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+def run(n_meetings, n_participants, lines_per_speaker, use_classifier):
+    detect, categorize_batch, tokenize = None, lambda lines, token_lists=None: ["today"] * len(lines), None
+    classifier = "keywords only"
+    if use_classifier:
+        import classifiers
+        detect, categorize_batch, tokenize = classifiers.detect_start_stop, classifiers.categorize_statements, classifiers.tokenize
+        # Load the models before the clock starts, or the first utterance times the load
+        classifier = ", ".join(f"{type(model.model).__name__} ({model.path})" for model in classifiers.get_models())
+
+    participants = [NAMES[i % len(NAMES)] + ("" if i < len(NAMES) else str(i)) for i in range(n_participants)]
+    script = meeting_script(participants, lines_per_speaker)
+    latencies = []
+
+    # Every meeting's speaker deadlines share one timer heap, as they would in a server process
+    scheduler = Scheduler()
+    start = time.perf_counter()
+    meetings = []
+    for _ in range(n_meetings):
+        engine = MeetingEngine(detect_start_stop=detect, categorize_batch=categorize_batch, tokenize=tokenize,
+                               scheduler=scheduler)
+        for name in participants:
+            engine.add_participant(name, 120)
+        engine.start_meeting()
+        meetings.append(engine)
+
+    # Interleave utterances across meetings as they would arrive in a shared process
+    for text in script:
+        for engine in meetings:
+            t0 = time.perf_counter()
+            engine.handle_utterance(text)
+            latencies.append(time.perf_counter() - t0)
+
+    for engine in meetings:
+        engine.end_meeting()
+        engine.summary()
+    elapsed = time.perf_counter() - start
+
+    print(f"Meetings: {n_meetings} x {n_participants} participants, {len(script)} utterances each")
+    print(f"Classifier: {classifier}")
+    print(f"Total time: {elapsed:.3f} s")
+    print(f"Pending speaker timers after the run: {len(scheduler)}")
+    print(f"Meetings/sec: {n_meetings / elapsed:.1f}")
+    print(f"Utterances/sec: {len(latencies) / elapsed:.1f}")
+    print(f"Per-utterance latency: mean {statistics.mean(latencies) * 1e6:.1f} us, "
+          f"p50 {percentile(latencies, 50) * 1e6:.1f} us, "
+          f"p99 {percentile(latencies, 99) * 1e6:.1f} us, "
+          f"max {max(latencies) * 1e6:.1f} us")
+    if use_classifier:
+        print(classifiers.result_cache.stats_text())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark many concurrent MeetingEngine instances in one process.")
+    parser.add_argument("--meetings", type=int, default=200)
+    parser.add_argument("--participants", type=int, default=8)
+    parser.add_argument("--lines", type=int, default=3, help="status lines per speaker")
+    parser.add_argument("--keywords-only", action="store_true", help="skip the sklearn start/stop classifier")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    run(args.meetings, args.participants, args.lines, not args.keywords_only)
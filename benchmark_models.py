@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.metrics import accuracy_score, f1_score
+from sklearn.model_selection import train_test_split
+from sklearn.svm import LinearSVC
+
+from model_artifact import export_model, load_model
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DATASETS = {
+    "category": ("category_labeled.csv", "category_model.bin"),
+    "startstop": ("start_stop_labeled.csv", "startstop_model.bin"),
+}
+BASELINE_PATH = "model_benchmark_baseline.json"
+# The regression gate compares medians; a slowdown must exceed both the relative
+# tolerance and this many milliseconds, so timer noise on a ~20 us call cannot trip it
+MIN_REGRESSION_MS = 0.05
+
+FEATURES = {
+    "tfidf-5k": lambda: TfidfVectorizer(max_features=5000),
+    "tfidf": lambda: TfidfVectorizer(),
+    "tfidf-1-2gram": lambda: TfidfVectorizer(ngram_range=(1, 2), max_features=20000),
+    "tfidf-sublinear": lambda: TfidfVectorizer(sublinear_tf=True, min_df=2),
+    "hash-2^14": lambda: HashingVectorizer(n_features=2 ** 14, alternate_sign=False),
+    "hash-2^18": lambda: HashingVectorizer(n_features=2 ** 18, alternate_sign=False),
+}
+CLASSIFIERS = {
+    "logreg": lambda: LogisticRegression(max_iter=1000),
+    "sgd-log": lambda: SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42),
+    "linear-svc": lambda: LinearSVC(),
+}
+
+def percentile(sorted_values, pct):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * pct / 100))]
+
+def measure(artifact_path, test_texts, test_labels, repeats, load_repeats=20):
+    """Metrics for one artifact, as the apps run it: mmap load, tokenize, predict."""
+    load_times = []
+    for _ in range(load_repeats):
+        t = time.perf_counter()
+        model = load_model(artifact_path)
+        load_times.append(time.perf_counter() - t)
+
+    predictions = model.predict([model.tokenize(text) for text in test_texts])
+    # One statement at a time, tokenization included, like an utterance arriving from ASR
+    latencies = []
+    for i in range(repeats):
+        text = test_texts[i % len(test_texts)]
+        t = time.perf_counter()
+        model.predict([model.tokenize(text)])
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+
+    t = time.perf_counter()
+    model.predict([model.tokenize(text) for text in test_texts])
+    batch_time = time.perf_counter() - t
+    return {
+        "accuracy": accuracy_score(test_labels, predictions),
+        "macro_f1": f1_score(test_labels, predictions, average="macro"),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput": len(test_texts) / batch_time,
+        "size_kb": os.path.getsize(artifact_path) / 1024,
+        "load_ms": sorted(load_times)[len(load_times) // 2] * 1000,
+    }
+
+def pareto(results):
+    # A config is on the frontier if nothing else is at least as accurate and at least as fast
+    frontier = set()
+    for name, r in results.items():
+        dominated = any(o["macro_f1"] >= r["macro_f1"] and o["p99_ms"] <= r["p99_ms"]
+                        and (o["macro_f1"] > r["macro_f1"] or o["p99_ms"] < r["p99_ms"])
+                        for other, o in results.items() if other != name)
+        if not dominated:
+            frontier.add(name)
+    return frontier
+
+def print_table(dataset, results, budget_ms):
+    frontier = pareto(results)
+    print(f"\n{dataset}  (* = Pareto frontier on macro-F1 vs p99 latency"
+          f"{f'; ! = over the {budget_ms} ms budget' if budget_ms else ''})")
+    print(f"  {'config':<28} {'acc':>6} {'F1':>6} {'p50 ms':>7} {'p99 ms':>7} {'lines/s':>9} "
+          f"{'size KB':>9} {'load ms':>8}")
+    for name, r in sorted(results.items(), key=lambda item: (-item[1]["macro_f1"], item[1]["p99_ms"])):
+        mark = ("*" if name in frontier else " ") + ("!" if budget_ms and r["p99_ms"] > budget_ms else " ")
+        print(f"{mark}{name:<28} {r['accuracy']:6.3f} {r['macro_f1']:6.3f} {r['p50_ms']:7.3f} {r['p99_ms']:7.3f} "
+              f"{r['throughput']:9.0f} {r['size_kb']:9.1f} {r['load_ms']:8.3f}")
+
+def benchmark_dataset(csv_path, deployed_path, features, classifiers, repeats, tmp):
+    df = pd.read_csv(csv_path)
+    train_df, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=df["label"])
+    test_texts, test_labels = list(test_df["text"]), list(test_df["label"].astype(str))
+    results = {}
+    for feature_name in features:
+        for clf_name in classifiers:
+            name = f"{feature_name} + {clf_name}"
+            vectorizer = FEATURES[feature_name]()
+            clf = CLASSIFIERS[clf_name]()
+            t = time.perf_counter()
+            clf.fit(vectorizer.fit_transform(train_df["text"]), train_df["label"].astype(str))
+            train_s = time.perf_counter() - t
+            path = os.path.join(tmp, f"{os.path.basename(csv_path)}-{feature_name}-{clf_name}.bin")
+            export_model(vectorizer, clf, path)
+            results[name] = measure(path, test_texts, test_labels, repeats)
+            results[name]["train_s"] = train_s
+    if deployed_path and os.path.exists(deployed_path):
+        # The training scripts hold out their own 20% split, not necessarily this one (corrections are added
+        # first and the start/stop split is not stratified), so some of these test lines may have been trained on
+        results["deployed"] = measure(deployed_path, test_texts, test_labels, repeats)
+    return results
+
+def check_regressions(all_results, baseline, tolerance, budget_ms):
+    failures = []
+    for dataset, results in all_results.items():
+        deployed = results.get("deployed")
+        if deployed is None:
+            continue
+        if budget_ms and deployed["p99_ms"] > budget_ms:
+            failures.append(f"{dataset}: deployed p99 {deployed['p99_ms']:.3f} ms is over the {budget_ms} ms budget")
+        previous = baseline.get(dataset)
+        if not previous:
+            failures.append(f"{dataset}: no baseline to compare against (record one with --update-baseline)")
+            continue
+        allowed = max(previous["p50_ms"] * (1 + tolerance), previous["p50_ms"] + MIN_REGRESSION_MS)
+        if deployed["p50_ms"] > allowed:
+            failures.append(f"{dataset}: deployed p50 {deployed['p50_ms']:.3f} ms vs baseline "
+                            f"{previous['p50_ms']:.3f} ms ({allowed:.3f} ms allowed)")
+    return failures
+
+def main(args):
+    os.chdir(HERE)
+    features = args.features.split(",") if args.features else list(FEATURES)
+    classifiers = args.classifiers.split(",") if args.classifiers else list(CLASSIFIERS)
+    all_results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for dataset in args.datasets.split(","):
+            csv_path, deployed_path = DATASETS[dataset]
+            if not os.path.exists(csv_path):
+                print(f"\n{dataset}: {csv_path} not found, skipped (run prepare_labeled_data.py to create it)")
+                continue
+            all_results[dataset] = benchmark_dataset(csv_path, deployed_path, features, classifiers,
+                                                     args.repeats, tmp)
+            print_table(dataset, all_results[dataset], args.budget_ms)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(all_results, f, indent=2)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    failures = check_regressions(all_results, baseline, args.tolerance, args.budget_ms)
+    if args.update_baseline:
+        baseline.update({dataset: results["deployed"] for dataset, results in all_results.items()
+                         if "deployed" in results})
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=2)
+        print(f"\nBaseline written to {args.baseline}")
+    elif failures:
+        print("\nLatency check failed:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train a matrix of feature/classifier configs and compare "
+                                                 "accuracy against inference cost, including the deployed models.")
+    parser.add_argument("--datasets", default="category,startstop")
+    parser.add_argument("--features", help=f"comma-separated subset of {', '.join(FEATURES)}")
+    parser.add_argument("--classifiers", help=f"comma-separated subset of {', '.join(CLASSIFIERS)}")
+    parser.add_argument("--repeats", type=int, default=2000, help="single-statement calls for the latency percentiles")
+    parser.add_argument("--budget-ms", type=float, help="per-utterance p99 latency budget")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="deployed-model latencies from a previous run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed increase of the median latency over the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="record this run as the new baseline")
+    parser.add_argument("--json", help="also write every result to this file")
+    sys.exit(main(parser.parse_args()))
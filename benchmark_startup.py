@@ -0,0 +1,79 @@
+import argparse
+import importlib.util
+import os
+import re
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+MODULES = [
+    "tkinter", "meeting_engine", "classifiers", "model_artifact", "numpy",
+    "speech_recognition", "pyttsx3", "joblib", "sklearn", "torch", "sentence_transformers",
+]
+
+APPS = ["new.py", "scrum time keeping.py", "scrum time moderator.py"]
+
+def import_time(module):
+    # Cold import in a fresh interpreter; -X importtime reports cumulative microseconds per module
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=HERE, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|\s?(\S+)$", line)
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1e6
+    return None
+
+def first_window_child(app):
+    # Runs inside the child: import the app, build the window, draw it once
+    t0 = time.perf_counter()
+    spec = importlib.util.spec_from_file_location("app_under_test", os.path.join(HERE, app))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    t_import = time.perf_counter()
+    root = module.tk.Tk()
+    module.ScrumTimekeeper(root)
+    root.update()
+    t_window = time.perf_counter()
+    root.destroy()
+    print(f"READY {t_import - t0:.6f} {t_window - t0:.6f}", flush=True)
+
+def time_to_first_window(app):
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", app],
+                          cwd=HERE, capture_output=True, text=True)
+    total = time.perf_counter() - start
+    for line in proc.stdout.splitlines():
+        if line.startswith("READY"):
+            _, t_import, t_window = line.split()
+            return float(t_import), float(t_window), total
+    error = proc.stderr.strip().splitlines()
+    return error[-1] if error else f"exit code {proc.returncode}"
+
+def main():
+    print("Cold import time per module:")
+    for module in MODULES:
+        seconds = import_time(module)
+        print(f"  {module:<24} {'not installed' if seconds is None else f'{seconds * 1000:8.1f} ms'}")
+
+    print("\nTime to first window (fresh process):")
+    for app in APPS:
+        result = time_to_first_window(app)
+        if isinstance(result, str):
+            print(f"  {app:<24} failed: {result}")
+            continue
+        t_import, t_window, total = result
+        print(f"  {app:<24} app import {t_import * 1000:7.1f} ms, window drawn {t_window * 1000:7.1f} ms, "
+              f"incl. interpreter {total * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import cost per module and time-to-first-window per app.")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        first_window_child(args.child)
+    else:
+        main()
@@ -0,0 +1,132 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from sklearn.svm import LinearSVC
+
+import phrase_rules
+from model_artifact import export_model, load_model
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DATASETS = {
+    "category": ("category_labeled.csv", "category_vectorizer.joblib", "category_classifier.joblib",
+                 "category_model.bin"),
+    "startstop": ("start_stop_labeled.csv", "startstop_vectorizer.joblib", "startstop_classifier.joblib",
+                  "startstop_model.bin"),
+}
+# Parity needs statements, not correct labels: a dataset whose CSV is missing is
+# checked on these texts plus every phrase the start/stop rules know
+FALLBACK_CSV = "category_labeled.csv"
+
+# Fresh models covering every branch of the scorer: tf variants, norms, hashing signs,
+# one-vs-rest vs multinomial, and single-column binary models
+CONFIGS = {
+    "tfidf + logreg": (lambda: TfidfVectorizer(), lambda: LogisticRegression(max_iter=1000), False),
+    "tfidf sublinear l1 + logreg": (lambda: TfidfVectorizer(sublinear_tf=True, norm="l1"),
+                                    lambda: LogisticRegression(max_iter=1000), False),
+    "tf binary no-idf 1-2gram + sgd": (lambda: TfidfVectorizer(binary=True, use_idf=False, ngram_range=(1, 2)),
+                                       lambda: SGDClassifier(loss="log_loss", random_state=42), False),
+    "hash signed + linear-svc": (lambda: HashingVectorizer(n_features=2 ** 12),
+                                 lambda: LinearSVC(), False),
+    "tfidf + logreg binary": (lambda: TfidfVectorizer(), lambda: LogisticRegression(max_iter=1000), True),
+}
+
+def compare(model, vectorizer, clf, texts):
+    """Artifact vs sklearn on every text; returns (label mismatches, max |proba diff|)."""
+    X = vectorizer.transform(texts)
+    expected = [str(c) for c in clf.predict(X)]
+    expected_proba = clf.predict_proba(X) if hasattr(clf, "predict_proba") else None
+    results = [model.classify(model.tokenize(text)) for text in texts]
+
+    mismatches = [(text, want, got) for text, want, (got, _) in zip(texts, expected, results) if want != got]
+    proba_diff = 0.0
+    if expected_proba is not None:
+        proba_diff = float(np.abs(np.array([p for _, p in results]) - expected_proba).max())
+    return mismatches, proba_diff
+
+def single_statement_us(model, vectorizer, clf, texts, repeats=300):
+    # The live path: one utterance at a time
+    sample = [texts[i % len(texts)] for i in range(repeats)]
+    t = time.perf_counter()
+    for text in sample:
+        clf.predict(vectorizer.transform([text]))
+    sklearn_us = (time.perf_counter() - t) / repeats * 1e6
+    t = time.perf_counter()
+    for text in sample:
+        model.classify(model.tokenize(text))
+    return sklearn_us, (time.perf_counter() - t) / repeats * 1e6
+
+def report(name, model, vectorizer, clf, texts, max_proba_diff):
+    mismatches, proba_diff = compare(model, vectorizer, clf, texts)
+    single_sklearn_us, single_fast_us = single_statement_us(model, vectorizer, clf, texts)
+    ok = not mismatches and proba_diff <= max_proba_diff
+    print(f"  {'ok  ' if ok else 'FAIL'} {name:<34} {len(texts) - len(mismatches)}/{len(texts)} labels, "
+          f"max |proba diff| {proba_diff:.1e}, per statement {single_sklearn_us:7.1f} us sklearn vs "
+          f"{single_fast_us:5.1f} us artifact")
+    for text, want, got in mismatches[:5]:
+        print(f"       sklearn {want!r} vs artifact {got!r}: {text[:80]!r}")
+    return ok
+
+def fallback_texts():
+    texts = list(pd.read_csv(FALLBACK_CSV)["text"]) if os.path.exists(FALLBACK_CSV) else []
+    return texts + list(dict.fromkeys(rule.phrase for rule in phrase_rules.RULES))
+
+def main(args):
+    os.chdir(HERE)
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for dataset in args.datasets.split(","):
+            csv_path, vectorizer_path, clf_path, artifact_path = DATASETS[dataset]
+            if os.path.exists(csv_path):
+                df = pd.read_csv(csv_path)
+                texts, labels = list(df["text"]), df["label"].astype(str)
+                print(f"{dataset} ({len(texts)} statements)")
+            else:
+                texts, labels = fallback_texts(), None
+                print(f"{dataset} ({csv_path} not found; {len(texts)} statements from {FALLBACK_CSV} "
+                      f"and the phrase rules)")
+
+            if os.path.exists(artifact_path):
+                missing = [p for p in (vectorizer_path, clf_path) if not os.path.exists(p)]
+                if missing:
+                    print(f"  FAIL deployed {artifact_path}: cannot compare without {', '.join(missing)}")
+                    ok = False
+                else:
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore")
+                        vectorizer, clf = joblib.load(vectorizer_path), joblib.load(clf_path)
+                    ok &= report(f"deployed {artifact_path}", load_model(artifact_path), vectorizer, clf, texts,
+                                 args.max_proba_diff)
+
+            if labels is None:
+                # The fresh models are trained on the dataset's labels
+                print(f"  fresh models skipped: they need {csv_path}")
+                continue
+            for name, (make_vectorizer, make_clf, binary) in CONFIGS.items():
+                y = np.where(labels == labels.iloc[0], labels.iloc[0], "rest") if binary else labels
+                vectorizer, clf = make_vectorizer(), make_clf()
+                clf.fit(vectorizer.fit_transform(texts), y)
+                path = os.path.join(tmp, f"{dataset}.bin")
+                export_model(vectorizer, clf, path)
+                ok &= report(name, load_model(path), vectorizer, clf, texts, args.max_proba_diff)
+    if not ok:
+        print("Inference parity check failed")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that the artifact scorer predicts exactly what sklearn "
+                                                 "does on the labeled CSVs, and compare their cost.")
+    parser.add_argument("--datasets", default="category,startstop")
+    parser.add_argument("--max-proba-diff", type=float, default=1e-4,
+                        help="allowed probability difference (the artifact stores float32 weights)")
+    sys.exit(main(parser.parse_args()))
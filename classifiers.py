@@ -0,0 +1,297 @@
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import phrase_rules
+from online_learning import CorrectionLog, OnlineModel, read_corrections
+
+# Exported with model_artifact.export_model by the training scripts; the joblib
+# pickles are only used when an artifact is missing.
+CATEGORY_ARTIFACT = "category_model.bin"
+STARTSTOP_ARTIFACT = "startstop_model.bin"
+RESULT_CACHE_SIZE = 4096
+# How often get_models() looks at the model files for a retrained version
+RELOAD_CHECK_INTERVAL = 2.0
+
+def vectorize_tokens(vectorizer, token_lists):
+    # Equivalent to vectorizer.transform(raw_documents) on already tokenized input
+    import numpy as np
+    import scipy.sparse as sp
+    from sklearn.preprocessing import normalize
+
+    if not hasattr(vectorizer, "vocabulary_"):
+        # HashingVectorizer: nothing fitted, the hasher maps tokens straight to columns
+        from sklearn.feature_extraction import FeatureHasher
+        X = FeatureHasher(n_features=vectorizer.n_features, input_type="string",
+                          alternate_sign=vectorizer.alternate_sign).transform(token_lists)
+        if vectorizer.binary:
+            X.data.fill(1)
+        if vectorizer.norm:
+            X = normalize(X, norm=vectorizer.norm, copy=False)
+        return X
+
+    vocabulary = vectorizer.vocabulary_
+    indptr, indices, data = [0], [], []
+    for tokens in token_lists:
+        counts = {}
+        for token in tokens:
+            idx = vocabulary.get(token)
+            if idx is not None:
+                counts[idx] = counts.get(idx, 0) + 1
+        indices.extend(counts)
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    X = sp.csr_matrix((np.asarray(data, dtype=np.float64), indices, indptr),
+                      shape=(len(token_lists), len(vocabulary)))
+    X.sort_indices()
+    if vectorizer.binary:
+        X.data.fill(1)
+    if vectorizer.sublinear_tf:
+        np.log(X.data, X.data)
+        X.data += 1
+    if vectorizer.use_idf:
+        X.data *= vectorizer.idf_[X.indices]
+    if vectorizer.norm:
+        X = normalize(X, norm=vectorizer.norm, copy=False)
+    return X
+
+class SklearnTextModel:
+    # Same interface as model_artifact.LinearTextModel, backed by the joblib pickles
+    def __init__(self, vectorizer_path, clf_path):
+        import joblib
+        from model_artifact import analyzer_config
+        self.path = clf_path
+        self.vectorizer = joblib.load(vectorizer_path)
+        self.clf = joblib.load(clf_path)
+        self.classes = [str(c) for c in self.clf.classes_]
+        self.analyzer_config = analyzer_config(self.vectorizer)
+        self.tokenize = self.vectorizer.build_analyzer()
+        # The pickles do not record which corrections they were trained with
+        self.corrections = None
+
+    def predict(self, token_lists):
+        return [str(c) for c in self.clf.predict(vectorize_tokens(self.vectorizer, token_lists))]
+
+    def predict_proba(self, token_lists):
+        return list(self.clf.predict_proba(vectorize_tokens(self.vectorizer, token_lists)))
+
+class ResultCache:
+    """Bounded LRU of classifier results, shared by every meeting in the process.
+
+    Keys carry the model version, so a retrained artifact or an online
+    correction makes older entries unreachable; they age out of the LRU.
+    """
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key):
+        with self.lock:
+            try:
+                value = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"size": len(self.entries), "hits": self.hits, "misses": self.misses,
+                    "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups else 0.0}
+
+    def stats_text(self):
+        s = self.stats()
+        return (f"Classifier cache: {s['hit_rate']:.0%} hits ({s['hits']}/{s['hits'] + s['misses']}), "
+                f"{s['size']} entries, {s['evictions']} evicted")
+
+result_cache = ResultCache()
+
+def _artifact_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def _load(artifact_path, vectorizer_path, clf_path):
+    if os.path.exists(artifact_path):
+        from model_artifact import load_model
+        return load_model(artifact_path)
+    logging.info(f"{artifact_path} not found, loading {vectorizer_path} / {clf_path} with joblib")
+    return SklearnTextModel(vectorizer_path, clf_path)
+
+# Models are loaded on first use so importing this module stays cheap
+_models = None
+_models_lock = threading.Lock()
+_correction_log = CorrectionLog()
+# Corrected category per normalized statement; these win over the phrase-rule overrides
+_category_corrections = {}
+
+def _normalize(statement):
+    return " ".join(statement.lower().split())
+
+def _replay_corrections(model, kind):
+    # Log records after the ones the model was trained with are not in it yet; a model
+    # that does not say (the joblib fallback, older artifacts) gets every correction
+    corrections = read_corrections(kind, _correction_log.path, skip=model.corrections or 0)
+    for text, label in corrections:
+        model.learn(model.tokenize(text), label)
+        if kind == "category":
+            _category_corrections[_normalize(text)] = label
+    if corrections:
+        logging.info(f"Re-applied {len(corrections)} {kind} corrections logged after {model.path} was trained")
+
+_stamps = None
+_last_reload_check = 0.0
+
+def _artifacts_changed():
+    global _last_reload_check
+    now = time.monotonic()
+    if now - _last_reload_check < RELOAD_CHECK_INTERVAL:
+        return False
+    _last_reload_check = now
+    return tuple(_artifact_stamp(model.path) for model in _models) != _stamps
+
+def get_models():
+    global _models, _stamps
+    if _models is None or _artifacts_changed():
+        with _models_lock:
+            if _models is not None and tuple(_artifact_stamp(model.path) for model in _models) != _stamps:
+                logging.info("Model files changed on disk, reloading the classifiers")
+                _models = None
+            if _models is None:
+                cat_model = _load(CATEGORY_ARTIFACT, "category_vectorizer.joblib", "category_classifier.joblib")
+                ss_model = _load(STARTSTOP_ARTIFACT, "startstop_vectorizer.joblib", "startstop_classifier.joblib")
+                # Both models must share the analyzer settings for one token stream to feed both.
+                if cat_model.analyzer_config != ss_model.analyzer_config:
+                    raise RuntimeError("Category and start/stop vectorizers tokenize differently; retrain them with matching settings")
+                cat_model, ss_model = OnlineModel(cat_model), OnlineModel(ss_model)
+                _replay_corrections(cat_model, "category")
+                _replay_corrections(ss_model, "startstop")
+                _stamps = tuple(_artifact_stamp(model.path) for model in (cat_model, ss_model))
+                _models = (cat_model, ss_model)
+                # Results from the previous files can never be hit again
+                result_cache.clear()
+    return _models
+
+def model_versions():
+    # Changes when the files are reloaded or a correction is applied; worker_pool re-forks on it
+    models = get_models()
+    return (_stamps, tuple(model.version for model in models))
+
+def _reinit_locks():
+    # A fork can happen while another thread holds one of these; the child gets fresh ones
+    global _models_lock
+    _models_lock = threading.Lock()
+    result_cache.lock = threading.Lock()
+    _correction_log.lock = threading.Lock()
+    for model in _models or ():
+        model.lock = threading.Lock()
+
+os.register_at_fork(after_in_child=_reinit_locks)
+
+def preload():
+    # Load the models on a background thread so the first utterance does not pay for it
+    threading.Thread(target=get_models, daemon=True).start()
+
+def tokenize(statement):
+    # Preprocess + tokenize once; the result feeds both models
+    return get_models()[0].tokenize(statement)
+
+def _cache_key(kind, model, statement):
+    # Case and spacing never change the tokens, so "No blockers." and "no  blockers." share an entry
+    text = " ".join(statement.split())
+    if model.analyzer_config["lowercase"]:
+        text = text.lower()
+    return (kind, _stamps, model.version, text)
+
+def _predict_cached(kind, model, statements, token_lists):
+    keys = [_cache_key(kind, model, statement) for statement in statements]
+    results = [result_cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        tokens = [token_lists[i] if token_lists is not None else model.tokenize(statements[i]) for i in missing]
+        for i, result in zip(missing, model.predict(tokens)):
+            results[i] = result
+            result_cache.put(keys[i], result)
+    return results
+
+def categorize_statement(statement, tokens=None):
+    cat = _predict_cached("category", get_models()[0], [statement], None if tokens is None else [tokens])[0]
+    logging.debug(f"Categorized '{statement}' as {cat}")
+    return cat
+
+def detect_start_stop(statement, tokens=None):
+    val = _predict_cached("startstop", get_models()[1], [statement], None if tokens is None else [tokens])[0]
+    logging.debug(f"Start/stop classifier: '{statement}' -> {val}")
+    return val
+
+def detect_start_stop_batch(statements, token_lists=None):
+    if not statements:
+        return []
+    return _predict_cached("startstop", get_models()[1], statements, token_lists)
+
+def categorize_statements(statements, token_lists=None):
+    # One predict call for whatever part of the batch is not cached
+    if not statements:
+        return []
+    cats = _predict_cached("category", get_models()[0], statements, token_lists)
+    logging.debug(f"Categorized {len(statements)} statements in one batch")
+    return cats
+
+def apply_category_overrides(statements, cats):
+    result = []
+    for statement, cat in zip(statements, cats):
+        corrected = _category_corrections.get(_normalize(statement)) if _category_corrections else None
+        if corrected is not None:
+            cat = corrected
+        elif cat == "blocker" and "today_override" in phrase_rules.kinds(phrase_rules.scan(statement.lower())):
+            cat = "today"
+        result.append(cat)
+    return result
+
+def categorize_statement_with_override(statement, tokens=None):
+    return categorize_statements_with_override([statement], None if tokens is None else [tokens])[0]
+
+def categorize_statements_with_override(statements, token_lists=None):
+    return apply_category_overrides(statements, categorize_statements(statements, token_lists))
+
+def correct_category(statement, label, tokens=None):
+    """Apply a moderator's category correction to the live model and log it for the next training run."""
+    start = time.perf_counter()
+    if tokens is None:
+        tokens = tokenize(statement)
+    steps = get_models()[0].learn(tokens, label)
+    _category_corrections[_normalize(statement)] = label
+    _correction_log.append("category", statement, label)
+    logging.debug(f"Category correction '{statement}' -> {label}: {steps} steps, "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms")
+
+def correct_start_stop(statement, label, tokens=None):
+    start = time.perf_counter()
+    if tokens is None:
+        tokens = tokenize(statement)
+    steps = get_models()[1].learn(tokens, label)
+    _correction_log.append("startstop", statement, label)
+    logging.debug(f"Start/stop correction '{statement}' -> {label}: {steps} steps, "
+                  f"{(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,48 @@
+import os
+
+import torch
+from transformers import AutoModel, AutoTokenizer
+from onnxruntime.quantization import QuantType, quantize_dynamic
+
+from similarity import MODEL_NAME, ONNX_MODEL_DIR
+
+# Export the transformer behind all-MiniLM-L6-v2 to ONNX and quantize its
+# weights to int8. Pooling and normalization are done by OnnxBackend.
+
+class Encoder(torch.nn.Module):
+    # Fixed positional signature for the exporter; returns token embeddings only
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                          token_type_ids=token_type_ids).last_hidden_state
+
+os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+hub_name = f"sentence-transformers/{MODEL_NAME}"
+tokenizer = AutoTokenizer.from_pretrained(hub_name)
+model = AutoModel.from_pretrained(hub_name)
+
+sample = tokenizer(["Yesterday I fixed the deployment script."], return_tensors="pt")
+input_names = ["input_ids", "attention_mask", "token_type_ids"]
+dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+
+fp32_path = os.path.join(ONNX_MODEL_DIR, "model.onnx")
+int8_path = os.path.join(ONNX_MODEL_DIR, "model-int8.onnx")
+with torch.no_grad():
+    torch.onnx.export(
+        Encoder(model).eval(),
+        tuple(sample[name] for name in input_names),
+        fp32_path,
+        input_names=input_names,
+        output_names=["last_hidden_state"],
+        dynamic_axes=dynamic_axes,
+        opset_version=14,
+        dynamo=False,
+    )
+quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+tokenizer.save_pretrained(ONNX_MODEL_DIR)
+
+print(f"Wrote {fp32_path} ({os.path.getsize(fp32_path) / 1e6:.1f} MB)")
+print(f"Wrote {int8_path} ({os.path.getsize(int8_path) / 1e6:.1f} MB)")
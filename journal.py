@@ -0,0 +1,232 @@
+import copy
+import glob
+import json
+import logging
+import os
+import threading
+from enum import Enum
+
+JOURNAL_DIR = "journal"
+SNAPSHOT_FILE = "snapshot.json"
+# Group commit: events are buffered and written with one fsync per interval
+COMMIT_INTERVAL = 0.05
+# A snapshot bounds how much journal has to be replayed on recovery
+SNAPSHOT_EVERY = 1000
+SNAPSHOT_INTERVAL = 60.0
+
+def _plain(value):
+    return value.name if isinstance(value, Enum) else value
+
+def segment_path(journal_dir, first_seq):
+    return os.path.join(journal_dir, f"journal-{first_seq:012d}.jsonl")
+
+def empty_state():
+    return {"meeting_active": False, "current_speaker": None, "participants": {}}
+
+def apply_record(state, record):
+    """Redo one journaled event on a MeetingEngine.snapshot()-shaped dict."""
+    event, data = record["event"], record["data"]
+    participants = state["participants"]
+    name = data.get("name")
+    if event == "restored":
+        state.clear()
+        state.update(copy.deepcopy(data["state"]))
+    elif event == "participant_added":
+        participants[name] = {"T_alloc": data["allocated"], "T_used": 0, "state": "WAITING",
+                              "start_time": None, "spoken_lines": []}
+    elif event == "participant_removed":
+        participants.pop(name, None)
+        if state["current_speaker"] == name:
+            state["current_speaker"] = None
+    elif event == "statement_added":
+        participants[name]["spoken_lines"].append(data["text"])
+    elif event == "statements_cleared":
+        participants[name]["spoken_lines"] = []
+    elif event == "meeting_started":
+        state["meeting_active"] = True
+        state["current_speaker"] = None
+    elif event == "meeting_ended":
+        state["meeting_active"] = False
+    elif event == "speaker_started":
+        state["current_speaker"] = name
+        participants[name]["state"] = "SPEAKING"
+        participants[name]["start_time"] = data["at"]
+    elif event == "speaker_stopped":
+        participants[name].update(T_used=data["used"], state=data["state"], start_time=None)
+        if state["current_speaker"] == name:
+            state["current_speaker"] = None
+    elif event == "time_exceeded":
+        participants[name]["state"] = "EXCEEDED"
+
+def read_segment(path):
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # A torn final line from a crash mid-write; nothing after it was committed
+                logging.warning(f"Ignoring incomplete journal record in {path}")
+                return
+
+def recover(journal_dir=JOURNAL_DIR, resume_at=None):
+    """Rebuild the last meeting state from snapshot + journal.
+
+    Returns (state, last_seq), or (None, 0) when there is nothing to recover.
+    With resume_at, a speaker who was talking when the process died is
+    charged up to the last journaled event and resumes at resume_at.
+    """
+    state, seq, last_t = None, 0, None
+    snapshot_path = os.path.join(journal_dir, SNAPSHOT_FILE)
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        state, seq, last_t = snapshot["state"], snapshot["seq"], snapshot["t"]
+    for path in sorted(glob.glob(os.path.join(journal_dir, "journal-*.jsonl"))):
+        for record in read_segment(path):
+            if record["seq"] <= seq:
+                continue
+            if state is None:
+                state = empty_state()
+            apply_record(state, record)
+            seq, last_t = record["seq"], record["t"]
+    if state is None:
+        return None, 0
+
+    speaker = state["current_speaker"]
+    if resume_at is not None and speaker is not None:
+        pdata = state["participants"][speaker]
+        if pdata["start_time"] is not None:
+            pdata["T_used"] += max(0, last_t - pdata["start_time"])
+            pdata["start_time"] = resume_at
+    return state, seq
+
+class Journal:
+    """Append-only JSONL journal of every engine event.
+
+    The listener only serializes the event into a buffer, so it adds a few
+    microseconds to the engine call that emitted it. A writer thread appends
+    the buffer and fsyncs once per commit_interval (group commit). Every
+    snapshot_every events or snapshot_interval seconds it writes a snapshot
+    and starts a new segment, deleting the segments the snapshot covers, so
+    recovery replays at most one segment however long the session runs.
+    """
+
+    def __init__(self, engine, journal_dir=JOURNAL_DIR, start_seq=0, commit_interval=COMMIT_INTERVAL,
+                 snapshot_every=SNAPSHOT_EVERY, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.engine = engine
+        self.journal_dir = journal_dir
+        self.commit_interval = commit_interval
+        self.snapshot_every = snapshot_every
+        self.snapshot_interval = snapshot_interval
+        os.makedirs(journal_dir, exist_ok=True)
+        if start_seq == 0:
+            self.reset()
+        self.seq = self.committed_seq = self.snapshot_seq = start_seq
+        self.buffer = []
+        self.snapshot_due = False
+        self.running = True
+        self.cond = threading.Condition()
+        self.file = open(segment_path(journal_dir, start_seq + 1), "a", encoding="utf-8")
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+        engine.subscribe(self.on_engine_event)
+
+    def reset(self):
+        for path in glob.glob(os.path.join(self.journal_dir, "journal-*.jsonl")):
+            os.remove(path)
+        snapshot_path = os.path.join(self.journal_dir, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+    def on_engine_event(self, event, data):
+        # Called with the engine lock held, so seq order is the order of state changes. The timer
+        # events are the exception (emitted after the lock is released), but replaying them is idempotent
+        data = {k: _plain(v) for k, v in data.items() if k != "tokens"}
+        if event == "restored":
+            data["state"] = self.engine.snapshot()
+        with self.cond:
+            self.seq += 1
+            record = {"seq": self.seq, "t": self.engine.clock(), "event": event, "data": data}
+            self.buffer.append(json.dumps(record) + "\n")
+            if event == "restored" or self.seq - self.snapshot_seq >= self.snapshot_every:
+                self.snapshot_due = True
+
+    def _writer(self):
+        last_snapshot = self.engine.clock()
+        while True:
+            with self.cond:
+                if self.running:
+                    self.cond.wait(self.commit_interval)
+                running = self.running
+                snapshot_due = self.snapshot_due or (
+                    self.seq > self.snapshot_seq and self.engine.clock() - last_snapshot >= self.snapshot_interval)
+            try:
+                if snapshot_due:
+                    self._snapshot()
+                    last_snapshot = self.engine.clock()
+                else:
+                    self._commit()
+            except OSError as e:
+                logging.error(f"Journal write failed: {e}")
+            if not running:
+                return
+
+    def _write(self, lines, seq):
+        if lines:
+            self.file.write("".join(lines))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+        with self.cond:
+            self.committed_seq = seq
+            self.cond.notify_all()
+
+    def _commit(self):
+        with self.cond:
+            lines, self.buffer = self.buffer, []
+            seq = self.seq
+        self._write(lines, seq)
+
+    def _snapshot(self):
+        # Lock order matches on_engine_event: engine first, then journal. The
+        # buffer taken here ends exactly at the snapshot's seq; later events
+        # go to the next segment.
+        with self.engine.lock:
+            state = self.engine.snapshot()
+            with self.cond:
+                seq = self.seq
+                lines, self.buffer = self.buffer, []
+                self.snapshot_due = False
+        self._write(lines, seq)
+        snapshot = {"seq": seq, "t": self.engine.clock(), "state": state}
+        tmp = os.path.join(self.journal_dir, SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, os.path.join(self.journal_dir, SNAPSHOT_FILE))
+
+        # Everything up to seq is in the snapshot; continue in a fresh segment
+        old_file = self.file
+        self.file = open(segment_path(self.journal_dir, seq + 1), "a", encoding="utf-8")
+        old_file.close()
+        current = os.path.abspath(self.file.name)
+        for path in glob.glob(os.path.join(self.journal_dir, "journal-*.jsonl")):
+            if os.path.abspath(path) != current:
+                os.remove(path)
+        with self.cond:
+            self.snapshot_seq = seq
+        logging.debug(f"Journal snapshot at seq {seq}")
+
+    def sync(self, timeout=2):
+        """Block until every event emitted so far is on disk."""
+        with self.cond:
+            target = self.seq
+            self.cond.notify_all()
+            return self.cond.wait_for(lambda: self.committed_seq >= target, timeout)
+
+    def close(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+        self.thread.join(timeout=2)
+        self.file.close()
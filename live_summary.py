@@ -0,0 +1,204 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from meeting_engine import CATEGORIES, format_summary
+
+SUMMARY_DIR = "summaries"
+FLUSH_INTERVAL = 1.0
+# Where statements go when the classifier fails on them, so the summary never loses a line
+FALLBACK_CATEGORY = "today"
+
+def write_atomic(path, text):
+    # Readers, and a crash mid-write, only ever see the old or the new file
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+class LiveSummary:
+    """Meeting summary built while the meeting runs.
+
+    Engine events are queued and applied on a background thread; statements
+    are categorized in batches as they arrive, using the engine's own
+    categorize_batch, so the end-of-meeting summary is already done. While
+    a meeting is running the document is rewritten as Markdown and JSON in
+    summary_dir at most once per flush_interval, and again when it ends.
+    """
+
+    def __init__(self, engine, summary_dir=SUMMARY_DIR, flush_interval=FLUSH_INTERVAL):
+        self.engine = engine
+        self.summary_dir = summary_dir
+        self.flush_interval = flush_interval
+        self.events = queue.Queue()
+        self.document = {}
+        self.lock = threading.Lock()
+        self.idle = threading.Condition(self.lock)
+        self.pending = 0
+        self.path = None
+        self.dirty = False
+        self.last_flush = 0.0
+        self.started_at = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        engine.subscribe(self.on_engine_event)
+
+    def on_engine_event(self, event, data):
+        if event in ("participant_added", "participant_removed", "statement_added", "statements_cleared",
+                     "speaker_stopped", "meeting_started", "meeting_ended", "restored"):
+            with self.lock:
+                self.pending += 1
+            self.events.put((event, data))
+
+    def _run(self):
+        while True:
+            try:
+                batch = [self.events.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                self._maybe_flush()
+                continue
+            while True:
+                try:
+                    batch.append(self.events.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._apply(batch)
+            except Exception as e:
+                logging.error(f"Live summary update failed: {e}")
+            with self.lock:
+                self.pending -= len(batch)
+                self.idle.notify_all()
+            self._maybe_flush(force=any(event == "meeting_ended" for event, _ in batch))
+
+    def _apply(self, batch):
+        # One categorize call for every statement that arrived since the last pass
+        statements = [data for event, data in batch if event == "statement_added"]
+        cats = []
+        if statements:
+            token_lists = [data.get("tokens") for data in statements]
+            if any(tokens is None for tokens in token_lists):
+                token_lists = None
+            cats = iter(self._categorize([data["text"] for data in statements], token_lists))
+        restored = None
+        if any(event == "restored" for event, _ in batch):
+            # A recovered meeting: categorize everything it already contains in one pass
+            participants = self.engine.snapshot()["participants"]
+            restored_cats = iter(self._categorize([line for pdata in participants.values()
+                                                   for line in pdata["spoken_lines"]], None))
+            restored = {name: {cat: [] for cat in CATEGORIES} for name in participants}
+            for name, pdata in participants.items():
+                for line in pdata["spoken_lines"]:
+                    restored[name][next(restored_cats)].append(line)
+
+        with self.lock:
+            for event, data in batch:
+                name = data.get("name")
+                if event == "participant_added":
+                    self.document.setdefault(name, {cat: [] for cat in CATEGORIES})
+                elif event == "participant_removed":
+                    self.document.pop(name, None)
+                elif event == "statements_cleared":
+                    self.document[name] = {cat: [] for cat in CATEGORIES}
+                elif event == "statement_added":
+                    self.document.setdefault(name, {cat: [] for cat in CATEGORIES})[next(cats)].append(data["text"])
+                elif event == "restored":
+                    self.document = restored
+                if event == "meeting_started" or (event == "restored" and self.path is None):
+                    self.started_at = datetime.now()
+                    self.path = os.path.join(self.summary_dir, f"meeting-{self.started_at:%Y%m%d-%H%M%S}")
+                self.dirty = True
+
+    def _categorize(self, texts, token_lists):
+        if not texts:
+            return []
+        try:
+            return self.engine.categorize_batch(texts, token_lists=token_lists)
+        except Exception as e:
+            logging.error(f"Categorizing {len(texts)} statements failed, filed under {FALLBACK_CATEGORY}: {e}")
+            return [FALLBACK_CATEGORY] * len(texts)
+
+    def recategorize(self, name, text, category):
+        """Move one statement to a moderator-corrected category; the files catch up on the next flush."""
+        with self.lock:
+            categorized = self.document.get(name)
+            if categorized is None:
+                return False
+            for lines in categorized.values():
+                if text in lines:
+                    lines.remove(text)
+                    break
+            categorized[category].append(text)
+            self.dirty = True
+        return True
+
+    def wait(self, timeout=5):
+        """Block until every queued event has been applied."""
+        with self.lock:
+            return self.idle.wait_for(lambda: self.pending == 0, timeout)
+
+    def rows(self):
+        with self.engine.lock:
+            used = {name: pdata["T_used"] for name, pdata in self.engine.participants.items()}
+        with self.lock:
+            return [(name, used.get(name, 0), {cat: list(lines) for cat, lines in categorized.items()})
+                    for name, categorized in self.document.items()]
+
+    def summary(self):
+        """Same rows as MeetingEngine.summary(), without re-categorizing anything."""
+        self.wait()
+        return self.rows()
+
+    def summary_text(self):
+        return format_summary(self.summary())
+
+    def to_json(self, rows):
+        return json.dumps({
+            "started": self.started_at.isoformat(timespec="seconds") if self.started_at else None,
+            "updated": datetime.now().isoformat(timespec="seconds"),
+            "meeting_active": self.engine.meeting_active,
+            "participants": [{"name": name, "used_seconds": round(used, 1), "categories": categorized}
+                             for name, used, categorized in rows],
+        }, indent=2)
+
+    def to_markdown(self, rows):
+        lines = ["# Meeting Summary", ""]
+        if self.started_at:
+            lines += [f"Started {self.started_at:%Y-%m-%d %H:%M}, updated {datetime.now():%H:%M:%S}", ""]
+        for name, used, categorized in rows:
+            lines += [f"## {name.capitalize()} (used {used / 60:.2f} min)", ""]
+            if not any(categorized.values()):
+                lines += ["_No statements recorded._", ""]
+                continue
+            for cat in CATEGORIES:
+                if categorized[cat]:
+                    lines += [f"### {cat.capitalize()}", ""] + [f"- {line}" for line in categorized[cat]] + [""]
+        return "\n".join(lines)
+
+    def _maybe_flush(self, force=False):
+        with self.lock:
+            if self.path is None or not self.dirty:
+                return
+            if not force and time.monotonic() - self.last_flush < self.flush_interval:
+                return
+            self.dirty = False
+            self.last_flush = time.monotonic()
+            path = self.path
+        try:
+            self.flush(path)
+        except OSError as e:
+            logging.error(f"Could not write live summary: {e}")
+
+    def flush(self, path=None):
+        path = path or self.path
+        rows = self.rows()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        write_atomic(path + ".md", self.to_markdown(rows))
+        write_atomic(path + ".json", self.to_json(rows))
+        logging.debug(f"Live summary written to {path}.md / .json")
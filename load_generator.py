@@ -0,0 +1,164 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import aiohttp
+
+from metrics import LatencyHistogram
+from replay import MODERATORS, START_CUE, STOP_CUE, load_meetings, timestamp_lines
+
+URL = "http://127.0.0.1:8080"
+
+def utterance_script(utterances, moderators=MODERATORS):
+    """[(at_seconds, text)] for one meeting, with the moderator cues injected at every change of speaker as replay does."""
+    participants = sorted({u.speaker for u in utterances if u.speaker and u.speaker not in moderators})
+    script = []
+    turn = None
+    for u in utterances:
+        if u.speaker != turn:
+            if turn in participants:
+                script.append((u.start, STOP_CUE))
+            if u.speaker in participants:
+                script.append((u.start, START_CUE.format(name=u.speaker)))
+            turn = u.speaker
+        script.append((u.start, u.text))
+    if turn in participants and utterances:
+        script.append((utterances[-1].end, STOP_CUE))
+    return participants, script
+
+class Results:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.utterances = 0
+        self.errors = 0
+        self.events = {}
+        self.meetings = 0
+
+async def watch_events(session, url, results):
+    try:
+        async with session.ws_connect(url) as ws:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    break
+                event = json.loads(msg.data)["event"]
+                results.events[event] = results.events.get(event, 0) + 1
+    except aiohttp.ClientError as e:
+        logging.warning(f"Event stream {url} failed: {e}")
+
+async def run_meeting(session, base_url, participants, script, alloc, speed, results):
+    async with session.post(f"{base_url}/meetings", json={
+            "participants": [{"name": name, "seconds": alloc} for name in participants], "start": True}) as resp:
+        if resp.status != 201:
+            results.errors += 1
+            logging.error(f"Creating a meeting failed: {resp.status} {await resp.text()}")
+            return
+        meeting_id = (await resp.json())["id"]
+    watcher = asyncio.create_task(watch_events(session, f"{base_url}/meetings/{meeting_id}/events", results))
+
+    start = time.perf_counter()
+    for at, text in script:
+        if speed:
+            delay = start + at / speed - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        t = time.perf_counter()
+        try:
+            async with session.post(f"{base_url}/meetings/{meeting_id}/utterances", json={"text": text}) as resp:
+                await resp.read()
+                ok = resp.status == 200
+        except aiohttp.ClientError as e:
+            logging.error(f"Utterance failed: {e}")
+            ok = False
+        results.latency.record(time.perf_counter() - t)
+        results.utterances += 1
+        results.errors += not ok
+
+    async with session.post(f"{base_url}/meetings/{meeting_id}/end") as resp:
+        await resp.read()
+    async with session.delete(f"{base_url}/meetings/{meeting_id}") as resp:
+        await resp.read()
+    # Deleting the meeting closes its event stream
+    await watcher
+    results.meetings += 1
+
+async def wait_for_server(session, base_url, timeout):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            async with session.get(f"{base_url}/stats") as resp:
+                if resp.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        if time.monotonic() > deadline:
+            raise SystemExit(f"No server answering at {base_url}")
+        await asyncio.sleep(0.2)
+
+async def main(args):
+    meetings = []
+    for lines in load_meetings(args.source):
+        participants, script = utterance_script(timestamp_lines(lines))
+        if participants:
+            meetings.append((participants, script))
+        if len(meetings) >= args.distinct:
+            break
+    if not meetings:
+        raise SystemExit(f"No meetings found in {args.source}")
+
+    results = Results()
+    connector = aiohttp.TCPConnector(limit=args.connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        await wait_for_server(session, args.url, args.wait)
+        start = time.perf_counter()
+        await asyncio.gather(*(run_meeting(session, args.url, *meetings[i % len(meetings)], args.alloc, args.speed,
+                                           results) for i in range(args.meetings)))
+        elapsed = time.perf_counter() - start
+        async with session.get(f"{args.url}/stats") as resp:
+            server = await resp.json()
+
+    s = results.latency.summary()
+    print(f"{results.meetings} meetings ({len(meetings)} distinct transcripts) run concurrently, "
+          f"{results.utterances} utterances in {elapsed:.2f} s: {results.utterances / elapsed:,.0f} utterances/s")
+    print(f"Round trip: p50 {s['p50'] * 1000:.2f} ms, p90 {s['p90'] * 1000:.2f} ms, p99 {s['p99'] * 1000:.2f} ms, "
+          f"max {s['max'] * 1000:.2f} ms")
+    print(f"Errors: {results.errors}")
+    print(f"Events received: {', '.join(f'{k} {v}' for k, v in sorted(results.events.items()))}")
+    latency = server["utterance_latency_ms"]
+    print(f"Server-side handling: p50 {latency['p50']:.3f} ms, p99 {latency['p99']:.3f} ms; "
+          f"classifier cache: {server['classifier_cache']}")
+    return 1 if results.errors else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay transcripts as many concurrent meetings against "
+                                                 "meeting_service.py and report throughput and tail latency.")
+    parser.add_argument("--url", default=URL)
+    parser.add_argument("--source", default="category_labeled.csv",
+                        help="category_labeled.csv, a local MOM export (.csv/.jsonl/.parquet) or a dataset name")
+    parser.add_argument("--meetings", type=int, default=50, help="concurrent meetings to run")
+    parser.add_argument("--distinct", type=int, default=20, help="distinct transcripts to cycle through")
+    parser.add_argument("--alloc", type=float, default=30, help="allocated seconds per participant")
+    parser.add_argument("--speed", type=float, default=0,
+                        help="replay at this multiple of real time (0 = as fast as the server answers)")
+    parser.add_argument("--connections", type=int, default=0,
+                        help="maximum open HTTP connections, event streams included (0 = no limit)")
+    parser.add_argument("--spawn", action="store_true", help="start meeting_service.py on the --url port first")
+    parser.add_argument("--wait", type=float, default=30, help="seconds to wait for the server to answer")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    server = None
+    if args.spawn:
+        port = args.url.rsplit(":", 1)[-1].strip("/")
+        server = subprocess.Popen([sys.executable, "meeting_service.py", "--port", port],
+                                  cwd=os.path.dirname(os.path.abspath(__file__)))
+    try:
+        status = asyncio.run(main(args))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+    sys.exit(status)
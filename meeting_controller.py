@@ -0,0 +1,364 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+import time
+import logging
+import queue
+import threading
+
+from audio_pipeline import AudioPipeline
+from classifiers import categorize_statements, detect_start_stop, preload, result_cache as classifier_cache, tokenize
+from journal import JOURNAL_DIR, Journal, recover
+from live_summary import LiveSummary
+from meeting_engine import MeetingEngine
+from meeting_view import MeetingTreeView
+from metrics import LatencyHistogram
+from scheduler import Scheduler
+from summary_window import SummaryWindow
+from tts_worker import TTSWorker, announcement, meeting_announcements
+
+class MeetingController:
+    """Everything the Tk apps share: engine, scheduler, audio pipeline, TTS,
+    journal, live summary and the Setup/Meeting tabs.
+
+    An app subclasses it and only adds what differs: extra setup widgets
+    (setup_setup_tab), extra meeting-tab rows (add_meeting_controls), an
+    agenda to enable the similarity report, or a different categorizer.
+    """
+
+    # Agenda items for the similarity report (e.g. agenda.STANDUP_AGENDA); None leaves the report out
+    agenda = None
+
+    def __init__(self, root, categorize_batch=categorize_statements, classifier_pool=None):
+        self.root = root
+        self.root.title("Scrum Timekeeper")
+        self.root.geometry("800x600")
+        # One timer thread owns every speaker deadline
+        self.scheduler = Scheduler()
+        self.scheduler.start()
+        self.classifier_pool = classifier_pool
+        if classifier_pool:
+            self.engine = MeetingEngine(detect_start_stop=classifier_pool.detect_start_stop,
+                                        categorize_batch=classifier_pool.categorize_statements,
+                                        scheduler=self.scheduler)
+        else:
+            self.engine = MeetingEngine(detect_start_stop=detect_start_stop, categorize_batch=categorize_batch,
+                                        tokenize=tokenize, scheduler=self.scheduler)
+        self.engine.subscribe(self.on_engine_event)
+        # Statements are categorized as they arrive and the summary is kept on disk
+        self.live_summary = LiveSummary(self.engine)
+        self.tts = TTSWorker()
+        self.journal = None
+        # ASR, TTS and the classifiers are imported on first use so the window appears immediately
+        self.recognizer = None
+        self.microphone = None
+        self.transcription_text = tk.StringVar()
+        self.command_queue = queue.Queue()
+        self.audio_pipeline = None
+        self.asr_stats_var = tk.StringVar()
+        # Phrase detection -> engine state transition -> screen updated
+        self.transition_latency = LatencyHistogram()
+        self.screen_latency = LatencyHistogram()
+        self.latency_var = tk.StringVar()
+        # The embedding model is loaded on a background thread once the window is up
+        self.similarity = None
+        self.similarity_status_var = tk.StringVar(value="Similarity model: loading...")
+        # UI updates posted by the timer, recognition and model threads, run by drain_tk_calls
+        self.tk_calls = queue.Queue()
+        self.tk_wake_pending = False
+        self.tk_wake_lock = threading.Lock()
+        self.setup_gui()
+        self.root.bind("<<RunOnTk>>", self.drain_tk_calls)
+
+    def setup_gui(self):
+        self.style = ttk.Style()
+        self.style.theme_use("clam")
+        self.notebook = ttk.Notebook(self.root)
+        self.notebook.pack(expand=True, fill="both", padx=10, pady=10)
+        self.setup_setup_tab()
+        self.setup_meeting_tab()
+
+    def setup_setup_tab(self):
+        self.setup_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.setup_tab, text="Setup")
+        frame = ttk.Frame(self.setup_tab, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        ttk.Label(frame, text="Participant Name:").grid(column=0, row=0, sticky=tk.W)
+        self.name_entry = ttk.Entry(frame, width=30)
+        self.name_entry.grid(column=1, row=0, sticky=(tk.W, tk.E))
+        ttk.Label(frame, text="Allocated Time (minutes):").grid(column=0, row=1, sticky=tk.W)
+        self.time_entry = ttk.Entry(frame, width=30)
+        self.time_entry.grid(column=1, row=1, sticky=(tk.W, tk.E))
+        ttk.Button(frame, text="Add Participant", command=self.add_participant_gui).grid(column=2, row=0, rowspan=2, padx=5)
+        self.tree = ttk.Treeview(frame, columns=('Name', 'Allocated'), show='headings')
+        self.tree.heading('Name', text='Name')
+        self.tree.heading('Allocated', text='Allocated Time (min)')
+        self.tree.grid(column=0, row=2, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=10)
+        ttk.Button(frame, text="Remove Selected", command=self.remove_participant).grid(column=0, row=3, pady=5)
+        ttk.Button(frame, text="Start Meeting", command=self.start_meeting).grid(column=2, row=3, pady=5)
+        return frame
+
+    def setup_meeting_tab(self):
+        self.meeting_tab = ttk.Frame(self.notebook)
+        self.notebook.add(self.meeting_tab, text="Meeting")
+        frame = ttk.Frame(self.meeting_tab, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.meeting_tree = ttk.Treeview(frame, columns=('Name', 'State', 'Used', 'Allocated'), show='headings')
+        self.meeting_tree.heading('Name', text='Name')
+        self.meeting_tree.heading('State', text='State')
+        self.meeting_tree.heading('Used', text='Used Time')
+        self.meeting_tree.heading('Allocated', text='Allocated Time')
+        self.meeting_tree.grid(column=0, row=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Row-level diffs, coalesced to one redraw per frame
+        self.meeting_view = MeetingTreeView(self.root, self.meeting_tree, self.engine)
+        self.status_var = tk.StringVar()
+        ttk.Label(frame, textvariable=self.status_var, wraplength=700).grid(column=0, row=1, columnspan=3, pady=10)
+        ttk.Button(frame, text="End Meeting", command=self.end_meeting).grid(column=1, row=2, pady=5)
+        if self.agenda:
+            ttk.Button(frame, text="Show Similarity Report", command=self.show_similarity_report).grid(column=2, row=2, pady=5)
+            ttk.Label(frame, textvariable=self.similarity_status_var).grid(column=0, row=2, sticky=tk.W, pady=5)
+        row = self.add_meeting_controls(frame, 3)
+        ttk.Label(frame, text="Real-Time Transcription (CC):").grid(column=0, row=row, sticky=tk.W, pady=(10,0))
+        transcription_label = ttk.Label(frame, textvariable=self.transcription_text, wraplength=700,
+                                        background="#f9f9f9", relief="solid", anchor="w", padding=5)
+        transcription_label.grid(column=0, row=row + 1, columnspan=3, sticky=(tk.W, tk.E), pady=(0,10))
+        # Manual entry for testing
+        self.manual_entry = ttk.Entry(frame, width=60)
+        self.manual_entry.grid(column=0, row=row + 2, columnspan=2, pady=(10,0))
+        ttk.Button(frame, text="Submit Statement", command=self.manual_statement).grid(column=2, row=row + 2, pady=(10,0))
+        ttk.Label(frame, textvariable=self.asr_stats_var).grid(column=0, row=row + 3, columnspan=3, sticky=tk.W, pady=(5,0))
+        ttk.Label(frame, textvariable=self.latency_var).grid(column=0, row=row + 4, columnspan=3, sticky=tk.W)
+
+    def add_meeting_controls(self, frame, row):
+        # Extra meeting-tab rows go here; returns the next free row
+        return row
+
+    @property
+    def participants(self):
+        return self.engine.participants
+
+    @property
+    def current_speaker(self):
+        return self.engine.current_speaker
+
+    @property
+    def meeting_active(self):
+        return self.engine.meeting_active
+
+    def run_on_tk(self, fn, *args):
+        # Tk is only driven from its own thread. Another thread queues the call and wakes the Tk
+        # loop, once per drain however many calls pile up; it must not hold engine.lock (the
+        # engine emits timer events after releasing it), or the wake would deadlock with the Tk loop
+        if threading.current_thread() is threading.main_thread():
+            fn(*args)
+            return
+        self.tk_calls.put((fn, args))
+        with self.tk_wake_lock:
+            if self.tk_wake_pending:
+                return
+            self.tk_wake_pending = True
+        try:
+            self.root.event_generate("<<RunOnTk>>", when="tail")
+        except (tk.TclError, RuntimeError) as e:
+            logging.debug(f"Could not wake the Tk loop: {e}")
+
+    def drain_tk_calls(self, event=None):
+        # Cleared first, so a call queued while draining wakes the loop again
+        with self.tk_wake_lock:
+            self.tk_wake_pending = False
+        while True:
+            try:
+                fn, args = self.tk_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception as e:
+                logging.error(f"Error in UI update {fn.__name__}: {e}")
+
+    def on_engine_event(self, event, data):
+        if event == "speaker_started":
+            self.run_on_tk(self.status_var.set, f"{data['name'].capitalize()} is now speaking.")
+        elif event == "time_warning":
+            self.run_on_tk(self.status_var.set,
+                           f"{data['name'].capitalize()} has used {data['fraction']:.0%} of their time "
+                           f"({data['remaining']:.0f}s left).")
+            # Earlier warnings are shown in the status line only
+            if data["fraction"] == self.engine.warning_thresholds[-1]:
+                self.tts.say(announcement(event, data["name"], data["fraction"]))
+        elif event == "time_exceeded":
+            # Spoken straight from the timer thread; the UI update follows on the Tk loop
+            self.interrupt_speaker(data["name"])
+            self.run_on_tk(self.handle_time_exceeded, data["name"])
+
+    def manual_statement(self):
+        text = self.manual_entry.get()
+        if text:
+            self.process_recognition(text)
+            self.manual_entry.delete(0, tk.END)
+
+    def add_participant_gui(self):
+        name = self.name_entry.get()
+        time_value = self.time_entry.get()
+        if not name or not time_value:
+            messagebox.showerror("Error", "Please enter both name and time")
+            return
+        try:
+            allocated_time = float(time_value) * 60
+        except ValueError:
+            messagebox.showerror("Error", "Invalid time format")
+            return
+        self.add_participant(name, allocated_time)
+        self.name_entry.delete(0, tk.END)
+        self.time_entry.delete(0, tk.END)
+
+    def add_participant(self, name, allocated_time_seconds):
+        try:
+            name = self.engine.add_participant(name, allocated_time_seconds)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.tree.insert('', 'end', iid=name, values=(name, f"{allocated_time_seconds / 60:.2f}"))
+
+    def remove_participant(self):
+        selected = self.tree.selection()
+        for item in selected:
+            self.engine.remove_participant(item)
+            self.tree.delete(item)
+
+    def start_meeting(self):
+        try:
+            self.engine.start_meeting()
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.status_var.set("Meeting started. Say a start phrase (e.g. 'Alice, you can start').")
+        self.notebook.select(self.meeting_tab)
+        self.tts.prerender(meeting_announcements(self.participants, self.engine.warning_thresholds[-1:]))
+        self.start_listening()
+
+    def start_listening(self):
+        import speech_recognition as sr
+        if self.recognizer is None:
+            self.recognizer = sr.Recognizer()
+            self.microphone = sr.Microphone()
+        # Capture and recognition run concurrently; results arrive in spoken order
+        self.audio_pipeline = AudioPipeline(self.recognizer, self.microphone, self.on_recognized)
+        self.audio_pipeline.start()
+        self.update_asr_stats()
+
+    def on_recognized(self, text):
+        self.run_on_tk(self.transcription_text.set, text)
+        self.process_recognition(text)
+
+    def update_asr_stats(self):
+        if self.audio_pipeline is None:
+            return
+        self.asr_stats_var.set(self.audio_pipeline.stats_text())
+        if self.meeting_active:
+            self.root.after(1000, self.update_asr_stats)
+
+    def process_recognition(self, text):
+        command = self.engine.process_recognition(text)
+        if command:
+            # Dispatched at once from the Tk thread; a recognition thread wakes the Tk loop for it
+            self.command_queue.put((*command, time.perf_counter()))
+            self.run_on_tk(self.dispatch_commands)
+
+    def dispatch_commands(self):
+        # Runs on the Tk thread, so state changes and redraws never race
+        dispatched = []
+        while True:
+            try:
+                command, participant, detected_at = self.command_queue.get_nowait()
+            except queue.Empty:
+                break
+            self.engine.handle_command(command, participant)
+            transitioned_at = time.perf_counter()
+            self.transition_latency.record(transitioned_at - detected_at)
+            dispatched.append(detected_at)
+        if not dispatched:
+            return
+        self.root.update_idletasks()
+        drawn_at = time.perf_counter()
+        for detected_at in dispatched:
+            self.screen_latency.record(drawn_at - detected_at)
+        self.latency_var.set(f"{self.transition_latency.summary_text('Command to transition')}; "
+                             f"{self.screen_latency.summary_text('to screen')}")
+
+    def handle_time_exceeded(self, participant):
+        self.status_var.set(f"{participant.capitalize()} exceeded allocated time.")
+        self.engine.stop_speaker(participant)
+        logging.debug(f"{participant} exceeded time and was stopped.")
+
+    def interrupt_speaker(self, participant):
+        self.tts.say(announcement("time_exceeded", participant))
+
+    def start_next_speaker(self):
+        if not self.meeting_active:
+            return
+        next_speaker = self.engine.get_next_waiting()
+        if not next_speaker:
+            self.status_var.set("All participants have spoken. Meeting is ending.")
+            self.end_meeting()
+            return
+        self.engine.set_speaker(next_speaker)
+
+    def end_meeting(self):
+        self.engine.end_meeting()
+        if self.audio_pipeline:
+            self.audio_pipeline.stop()
+            self.asr_stats_var.set(self.audio_pipeline.stats_text())
+        logging.info(self.classifier_pool.stats_text() if self.classifier_pool else classifier_cache.stats_text())
+        self.status_var.set("Meeting ended.")
+        self.show_meeting_summary()
+        if self.agenda:
+            messagebox.showinfo("Similarity Report", self.get_similarity_report())
+
+    def show_meeting_summary(self):
+        # Moderators can correct categories and start/stop labels from here
+        SummaryWindow(self.root, self.live_summary)
+
+    def start_similarity_service(self):
+        from similarity import EmbeddingService
+        self.similarity = EmbeddingService(
+            self.agenda, on_state_change=lambda state: self.run_on_tk(self.update_similarity_status))
+
+    def update_similarity_status(self):
+        self.similarity_status_var.set(self.similarity.status_text())
+
+    def get_similarity_report(self):
+        if self.similarity is None:
+            return "The similarity model is still loading; try again in a moment."
+        return self.similarity.report(self.participants)
+
+    def show_similarity_report(self):
+        messagebox.showinfo("Similarity Report", self.get_similarity_report())
+
+    def open_journal(self):
+        # Recovery replays one snapshot plus at most one journal segment
+        state, seq = recover(JOURNAL_DIR, resume_at=time.time())
+        resume = bool(state and state["meeting_active"]) and messagebox.askyesno(
+            "Resume Meeting", "The previous meeting did not end cleanly. Resume it?")
+        self.journal = Journal(self.engine, start_seq=seq if resume else 0)
+        if not resume:
+            return
+        self.engine.restore(state)
+        for name, pdata in self.participants.items():
+            self.tree.insert('', 'end', iid=name, values=(name, f"{pdata['T_alloc'] / 60:.2f}"))
+        self.status_var.set("Resumed the interrupted meeting.")
+        self.notebook.select(self.meeting_tab)
+        self.start_listening()
+
+    def warm_classifiers(self):
+        if self.classifier_pool:
+            threading.Thread(target=self.classifier_pool.start, daemon=True).start()
+        else:
+            preload()
+
+    def main_loop(self):
+        self.root.after_idle(self.open_journal)
+        # Warm the classifiers (or fork the worker pool) once the window is up rather than before it
+        self.root.after_idle(self.warm_classifiers)
+        if self.agenda:
+            self.root.after_idle(self.start_similarity_service)
+        self.root.mainloop()
@@ -0,0 +1,369 @@
+import time
+import logging
+import threading
+from enum import Enum
+
+from phrase_rules import start_stop_hits
+
+CATEGORIES = ["yesterday", "today", "blocker"]
+# Fractions of T_alloc at which a time_warning event is emitted; 1.0 is time_exceeded
+WARNING_THRESHOLDS = (0.5, 0.8)
+
+class ParticipantState(Enum):
+    WAITING = 1
+    SPEAKING = 2
+    EXCEEDED = 3
+    DONE = 4
+
+class MeetingEngine:
+    """UI-free meeting state machine.
+
+    Utterances go in through process_recognition / handle_command, state
+    transitions come out as events to subscribed listeners, and summary()
+    returns the categorized statements. It owns no Tk root, microphone or
+    thread, so many engines can live in one process.
+    """
+
+    def __init__(self, detect_start_stop=None, categorize_batch=None, tokenize=None, clock=time.time,
+                 scheduler=None, warning_thresholds=WARNING_THRESHOLDS):
+        self.participants = {}
+        self.current_speaker = None
+        self.meeting_active = False
+        self.detect_start_stop = detect_start_stop
+        self.categorize_batch = categorize_batch
+        # Shared feature front-end: each utterance is tokenized once and the
+        # tokens are handed to both classifiers and kept for the summary
+        self.tokenize = tokenize
+        self.clock = clock
+        # With a scheduler, speaker deadlines fire as timers and check_time() polling is unnecessary
+        self.scheduler = scheduler
+        self.warning_thresholds = sorted(warning_thresholds)
+        self.timers = {}
+        self.listeners = []
+        self.lock = threading.RLock()
+
+    def subscribe(self, listener):
+        # listener(event, data) is called synchronously on the thread that caused the event
+        self.listeners.append(listener)
+
+    def emit(self, event, **data):
+        for listener in list(self.listeners):
+            try:
+                listener(event, data)
+            except Exception as e:
+                logging.error(f"Listener error on {event}: {e}")
+
+    def add_participant(self, name, allocated_time_seconds):
+        name = name.lower()
+        with self.lock:
+            if name in self.participants:
+                raise ValueError(f"Participant {name} already exists")
+            self.participants[name] = {
+                "T_alloc": allocated_time_seconds,
+                "T_used": 0,
+                "state": ParticipantState.WAITING,
+                "start_time": None,
+                "spoken_lines": [],
+                "spoken_tokens": [],
+            }
+            logging.debug(f"Added participant {name} with {allocated_time_seconds/60:.2f} min")
+            self.emit("participant_added", name=name, allocated=allocated_time_seconds)
+        return name
+
+    def remove_participant(self, name):
+        with self.lock:
+            if name not in self.participants:
+                return
+            if self.current_speaker == name:
+                self.current_speaker = None
+            self.cancel_timers(name)
+            del self.participants[name]
+            self.emit("participant_removed", name=name)
+
+    def add_statement(self, name, text, tokens=None):
+        if tokens is None and self.tokenize is not None:
+            tokens = self.tokenize(text)
+        with self.lock:
+            pdata = self.participants[name]
+            pdata["spoken_lines"].append(text)
+            pdata["spoken_tokens"].append(tokens)
+            self.emit("statement_added", name=name, text=text, tokens=tokens)
+
+    def replace_statements(self, name, lines):
+        with self.lock:
+            pdata = self.participants[name]
+            pdata["spoken_lines"] = []
+            pdata["spoken_tokens"] = []
+            self.emit("statements_cleared", name=name)
+            for line in lines:
+                self.add_statement(name, line)
+
+    def start_meeting(self):
+        with self.lock:
+            if not self.participants:
+                raise ValueError("No participants added")
+            self.meeting_active = True
+            self.current_speaker = None
+            logging.debug("Meeting started. Awaiting start phrase.")
+            self.emit("meeting_started")
+
+    def end_meeting(self):
+        with self.lock:
+            if self.current_speaker:
+                self.stop_speaker(self.current_speaker)
+            self.meeting_active = False
+            logging.debug("Meeting ended.")
+            self.emit("meeting_ended")
+
+    def process_recognition(self, text):
+        """Classify one utterance; return a ("start"|"stop", name) command or None."""
+        text = text.strip().lower()
+        # Keyword rules first; a high-confidence hit settles it without the classifier
+        is_start, is_stop, decisive = start_stop_hits(text)
+        tokens = None
+        if not decisive:
+            tokens = self.tokenize(text) if self.tokenize is not None else None
+            action = None
+            if self.detect_start_stop is not None:
+                try:
+                    action = self.detect_start_stop(text, tokens=tokens)
+                except Exception:
+                    action = None
+            is_start = is_start or action == "start"
+            is_stop = is_stop or action == "stop"
+
+        with self.lock:
+            # Only treat as start if either classifier OR keyword matches AND current_speaker is None
+            if is_start and self.current_speaker is None:
+                for name in self.participants:
+                    if name in text:
+                        logging.debug(f"Start command detected for {name}")
+                        return ("start", name)
+                next_waiting = self.get_next_waiting()
+                if next_waiting is None:
+                    logging.debug(f"Start phrase but nobody is waiting. Ignored statement: {text}")
+                    return None
+                logging.debug("Start command detected for next waiting participant")
+                return ("start", next_waiting)
+
+            # Only treat as stop if either classifier OR keyword matches AND current_speaker is not None
+            if is_stop and self.current_speaker is not None:
+                logging.debug(f"Stop command detected for {self.current_speaker}")
+                return ("stop", self.current_speaker)
+
+            # Only add as a content line if NOT classified as start/stop by either method
+            if self.current_speaker and not is_start and not is_stop:
+                pdata = self.participants[self.current_speaker]
+                if pdata["state"] == ParticipantState.SPEAKING:
+                    self.add_statement(self.current_speaker, text, tokens)
+                    logging.debug(f"Added statement for {self.current_speaker}: {text}")
+                else:
+                    logging.debug(f"Did NOT add statement: {text} (state is {pdata['state']})")
+            else:
+                logging.debug(f"No current speaker or action was start/stop. Ignored statement: {text}")
+        return None
+
+    def handle_command(self, command, participant):
+        with self.lock:
+            logging.debug(f"Handling command: {command} for {participant}. Current speaker: {self.current_speaker}")
+            if command == "stop" and participant == self.current_speaker:
+                # Wait for an explicit start phrase for the next participant
+                self.stop_speaker(participant)
+            elif command == "start" and participant in self.participants:
+                self.set_speaker(participant)
+
+    def handle_utterance(self, text):
+        command = self.process_recognition(text)
+        if command:
+            self.handle_command(*command)
+        return command
+
+    def get_next_waiting(self):
+        waiting = [p for p, d in self.participants.items() if d["state"] == ParticipantState.WAITING]
+        logging.debug(f"Next waiting participant: {waiting[0] if waiting else None}")
+        return waiting[0] if waiting else None
+
+    def set_speaker(self, name):
+        logging.debug(f"set_speaker called for {name}")
+        with self.lock:
+            now = self.clock()
+            if self.current_speaker:
+                prev_name = self.current_speaker
+                prev = self.participants[prev_name]
+                if prev["start_time"] is not None:
+                    prev["T_used"] += now - prev["start_time"]
+                prev["state"] = ParticipantState.WAITING
+                prev["start_time"] = None
+                self.cancel_timers(prev_name)
+                logging.debug(f"Previous speaker was {prev_name}, set to WAITING")
+                self.emit("speaker_stopped", name=prev_name, state=prev["state"], used=prev["T_used"])
+            self.current_speaker = name
+            pdata = self.participants[name]
+            pdata["state"] = ParticipantState.SPEAKING
+            pdata["start_time"] = now
+            self.schedule_timers(name)
+            logging.debug(f"{name} state set to SPEAKING")
+            self.emit("speaker_started", name=name, at=now)
+
+    def stop_speaker(self, name):
+        logging.debug(f"stop_speaker called for {name}")
+        with self.lock:
+            pdata = self.participants.get(name)
+            if not pdata or pdata["state"] not in (ParticipantState.SPEAKING, ParticipantState.EXCEEDED):
+                return
+            if pdata["start_time"] is not None:
+                pdata["T_used"] += self.clock() - pdata["start_time"]
+            # An overrun speaker keeps the EXCEEDED state so it stays visible in the summary
+            if pdata["state"] == ParticipantState.SPEAKING:
+                pdata["state"] = ParticipantState.DONE
+            pdata["start_time"] = None
+            self.cancel_timers(name)
+            if self.current_speaker == name:
+                self.current_speaker = None
+            logging.debug(f"{name} state set to {pdata['state'].name}")
+            self.emit("speaker_stopped", name=name, state=pdata["state"], used=pdata["T_used"])
+
+    def used_time(self, name, now=None):
+        pdata = self.participants[name]
+        used = pdata["T_used"]
+        if pdata["start_time"] is not None:
+            used += (self.clock() if now is None else now) - pdata["start_time"]
+        return used
+
+    def check_time(self, now=None):
+        """Mark the current speaker EXCEEDED once over allocation; return their name if so."""
+        with self.lock:
+            name = self.current_speaker
+            if not self.meeting_active or name is None:
+                return None
+            pdata = self.participants[name]
+            if pdata["state"] != ParticipantState.SPEAKING:
+                return None
+            if self.used_time(name, now) < pdata["T_alloc"]:
+                return None
+            self._mark_exceeded(name)
+        self.emit("time_exceeded", name=name)
+        return name
+
+    def _mark_exceeded(self, name):
+        # The caller emits time_exceeded once it has released the lock
+        self.participants[name]["state"] = ParticipantState.EXCEEDED
+        self.cancel_timers(name)
+        logging.debug(f"{name} exceeded allocated time.")
+
+    def schedule_timers(self, name):
+        if self.scheduler is None:
+            return
+        pdata = self.participants[name]
+        self.cancel_timers(name)
+        timers = []
+        for fraction in self.warning_thresholds + [1.0]:
+            # Deadlines are absolute, so a resumed speaker only gets the thresholds still ahead
+            remaining = fraction * pdata["T_alloc"] - pdata["T_used"]
+            if remaining <= 0 and fraction < 1.0:
+                continue
+            deadline = pdata["start_time"] + max(remaining, 0)
+            timers.append(self.scheduler.call_at(deadline, lambda f=fraction: self._on_timer(name, f)))
+        self.timers[name] = timers
+
+    def cancel_timers(self, name):
+        for timer in self.timers.pop(name, ()):
+            self.scheduler.cancel(timer)
+
+    def _on_timer(self, name, fraction):
+        # Runs on the scheduler thread. The transition is made under the lock but
+        # announced after releasing it, so a listener that hands off to a thread
+        # waiting on the lock (the Tk loop) cannot deadlock with it
+        with self.lock:
+            pdata = self.participants.get(name)
+            if (not self.meeting_active or self.current_speaker != name or pdata is None
+                    or pdata["state"] != ParticipantState.SPEAKING):
+                return
+            if fraction >= 1.0:
+                self._mark_exceeded(name)
+                event, data = "time_exceeded", {"name": name}
+            else:
+                remaining = pdata["T_alloc"] - self.used_time(name)
+                logging.debug(f"{name} has used {fraction:.0%} of allocated time.")
+                event, data = "time_warning", {"name": name, "fraction": fraction, "remaining": remaining}
+        self.emit(event, **data)
+
+    def snapshot(self):
+        """Plain-data copy of the meeting state, as stored by the journal."""
+        with self.lock:
+            return {
+                "meeting_active": self.meeting_active,
+                "current_speaker": self.current_speaker,
+                "participants": {
+                    name: {
+                        "T_alloc": pdata["T_alloc"],
+                        "T_used": pdata["T_used"],
+                        "state": pdata["state"].name,
+                        "start_time": pdata["start_time"],
+                        "spoken_lines": list(pdata["spoken_lines"]),
+                    }
+                    for name, pdata in self.participants.items()
+                },
+            }
+
+    def restore(self, snapshot):
+        """Replace the meeting state with a snapshot() taken earlier and emit "restored"."""
+        with self.lock:
+            for name in list(self.timers):
+                self.cancel_timers(name)
+            self.participants = {}
+            for name, pdata in snapshot["participants"].items():
+                lines = list(pdata["spoken_lines"])
+                self.participants[name] = {
+                    "T_alloc": pdata["T_alloc"],
+                    "T_used": pdata["T_used"],
+                    "state": ParticipantState[pdata["state"]],
+                    "start_time": pdata["start_time"],
+                    "spoken_lines": lines,
+                    "spoken_tokens": [self.tokenize(line) if self.tokenize else None for line in lines],
+                }
+            self.meeting_active = snapshot["meeting_active"]
+            self.current_speaker = snapshot["current_speaker"]
+            if self.current_speaker is not None and self.participants[self.current_speaker]["state"] == ParticipantState.SPEAKING:
+                self.schedule_timers(self.current_speaker)
+            logging.debug(f"Restored meeting with {len(self.participants)} participants")
+            self.emit("restored")
+
+    def summary(self):
+        """Return [(name, used_seconds, {category: [lines]})] for every participant."""
+        # Copied under the lock and categorized after releasing it, so a long batch
+        # never holds up the utterances and timers of the meeting
+        with self.lock:
+            owners, lines, token_lists = [], [], []
+            used = [(name, pdata["T_used"]) for name, pdata in self.participants.items()]
+            for name, pdata in self.participants.items():
+                owners.extend([name] * len(pdata["spoken_lines"]))
+                lines.extend(pdata["spoken_lines"])
+                token_lists.extend(pdata["spoken_tokens"])
+        if self.tokenize is None or any(tokens is None for tokens in token_lists):
+            token_lists = None
+        # Every participant's lines in a single batched call
+        cats = self.categorize_batch(lines, token_lists=token_lists) if lines else []
+        categorized = {name: {cat: [] for cat in CATEGORIES} for name, _ in used}
+        for name, line, cat in zip(owners, lines, cats):
+            categorized[name][cat].append(line)
+        return [(name, t_used, categorized[name]) for name, t_used in used]
+
+    def summary_text(self):
+        logging.debug("Generating meeting summary...")
+        return format_summary(self.summary())
+
+def format_summary(rows):
+    """Render summary() rows as the plain-text report shown at the end of a meeting."""
+    parts = ["Meeting Summary:\n\n"]
+    for name, used, categorized in rows:
+        parts.append(f"{name.capitalize()} (used {used / 60:.2f} min):\n")
+        if not any(categorized.values()):
+            parts.append("  No statements recorded.\n")
+            continue
+        for cat in CATEGORIES:
+            if categorized[cat]:
+                parts.append(f"{cat.capitalize()}:\n")
+                parts.extend(f"  - {line}\n" for line in categorized[cat])
+        parts.append("\n")
+    return "".join(parts)
@@ -0,0 +1,379 @@
+import argparse
+import asyncio
+import json
+import logging
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+
+from aiohttp import WSMsgType, web
+
+import classifiers
+from agenda import STANDUP_AGENDA
+from meeting_engine import MeetingEngine
+from metrics import LatencyHistogram
+from scheduler import Scheduler
+from similarity import EmbeddingService
+from worker_pool import WorkerPool
+
+HOST = "127.0.0.1"
+PORT = 8080
+DEFAULT_ALLOCATION = 120
+# Events buffered per WebSocket subscriber; one that falls this far behind is disconnected
+SUBSCRIBER_QUEUE = 1000
+# With a worker pool, utterances wait on it from executor threads; this many can be in flight at once
+POOL_CLIENT_THREADS = 64
+
+def jsonable(data):
+    return {k: v.name if isinstance(v, Enum) else v for k, v in data.items() if k != "tokens"}
+
+def error(status, message):
+    return web.json_response({"error": message}, status=status)
+
+def recognize_pcm(pcm, sample_rate, sample_width):
+    # Blocking network call; runs in the executor
+    import speech_recognition as sr
+    try:
+        return sr.Recognizer().recognize_google(sr.AudioData(pcm, sample_rate, sample_width))
+    except sr.UnknownValueError:
+        return None
+
+class Meeting:
+    """One hosted meeting: an engine plus the WebSocket subscribers to its events.
+
+    Engine listeners run on whichever thread caused the event (the event loop
+    for utterances, the scheduler thread for speaker deadlines); events are
+    handed to the loop with call_soon_threadsafe and fanned out from there.
+    """
+
+    def __init__(self, meeting_id, engine, loop):
+        self.id = meeting_id
+        self.engine = engine
+        self.loop = loop
+        self.created = time.time()
+        self.subscribers = set()
+        self.summary_pending = False
+        engine.subscribe(self.on_engine_event)
+
+    def on_engine_event(self, event, data):
+        message = {"meeting": self.id, "event": event, "t": time.time(), "data": jsonable(data)}
+        self.loop.call_soon_threadsafe(self.publish, message)
+        if event == "time_exceeded":
+            # What the apps do on time_exceeded
+            self.engine.stop_speaker(data["name"])
+        elif event in ("speaker_stopped", "meeting_ended"):
+            self.loop.call_soon_threadsafe(self.schedule_summary)
+
+    def publish(self, message):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logging.warning(f"Meeting {self.id}: dropping a subscriber that stopped reading events")
+                self.close_subscriber(queue)
+
+    def close_subscriber(self, queue):
+        # None ends the event stream; a subscriber that stopped reading loses its oldest message to make room
+        self.subscribers.discard(queue)
+        try:
+            queue.put_nowait(None)
+        except asyncio.QueueFull:
+            queue.get_nowait()
+            queue.put_nowait(None)
+
+    def schedule_summary(self):
+        # Coalesced: however many speakers stop at once, one summary is computed and pushed
+        if self.subscribers and not self.summary_pending:
+            self.summary_pending = True
+            self.loop.create_task(self.push_summary())
+
+    async def push_summary(self):
+        try:
+            summary = await self.summary()
+        finally:
+            self.summary_pending = False
+        self.publish({"meeting": self.id, "event": "summary", "t": time.time(), "data": summary})
+
+    async def summary(self):
+        # Categorizing every line can take a while; keep it off the event loop
+        rows = await self.loop.run_in_executor(None, self.engine.summary)
+        return {"participants": [{"name": name, "used_seconds": round(used, 1), "categories": categorized}
+                                 for name, used, categorized in rows]}
+
+    async def similarity_report(self, similarity):
+        # A copy of the lines, so encoding them does not hold the engine lock the event loop needs
+        participants = self.engine.snapshot()["participants"]
+        return {"report": await self.loop.run_in_executor(None, similarity.report, participants),
+                "model": similarity.status_text()}
+
+    def state(self):
+        snapshot = self.engine.snapshot()
+        with self.engine.lock:
+            for name, pdata in snapshot["participants"].items():
+                pdata["used_seconds"] = round(self.engine.used_time(name), 1)
+                del pdata["spoken_lines"]
+        return {"id": self.id, "created": self.created, **snapshot}
+
+class MeetingService:
+    """Hosts any number of meetings over HTTP + WebSocket, all sharing one scheduler
+    thread, the one set of classifier models loaded by the classifiers module and
+    one embedding model for the similarity reports. With workers, classification
+    runs in a WorkerPool instead, micro-batched across meetings.
+
+    POST   /meetings                        {"participants": [{"name", "seconds"}], "start": bool}
+    GET    /meetings
+    GET    /meetings/{id}                   state
+    DELETE /meetings/{id}                   end and forget
+    POST   /meetings/{id}/participants      {"name", "seconds"}
+    POST   /meetings/{id}/start | /end
+    POST   /meetings/{id}/utterances        {"text"} -> the start/stop command it triggered, if any
+    POST   /meetings/{id}/audio             raw PCM body, ?sample_rate=16000&sample_width=2
+    GET    /meetings/{id}/summary
+    GET    /meetings/{id}/similarity        statements matched against the standup agenda
+    GET    /meetings/{id}/events            WebSocket: state snapshot, then every event as JSON;
+                                            {"text": ...} messages sent on it are handled as utterances
+    GET    /stats
+    """
+
+    def __init__(self, workers=0):
+        self.meetings = {}
+        self.pool = WorkerPool(workers) if workers else None
+        self.scheduler = Scheduler()
+        self.similarity = None
+        self.utterance_latency = LatencyHistogram()
+        self.utterances = 0
+        self.started = time.time()
+
+    def app(self):
+        app = web.Application()
+        app.add_routes([
+            web.post("/meetings", self.create_meeting),
+            web.get("/meetings", self.list_meetings),
+            web.get("/meetings/{id}", self.get_state),
+            web.delete("/meetings/{id}", self.delete_meeting),
+            web.post("/meetings/{id}/participants", self.add_participant),
+            web.post("/meetings/{id}/start", self.start_meeting),
+            web.post("/meetings/{id}/end", self.end_meeting),
+            web.post("/meetings/{id}/utterances", self.post_utterance),
+            web.post("/meetings/{id}/audio", self.post_audio),
+            web.get("/meetings/{id}/summary", self.get_summary),
+            web.get("/meetings/{id}/similarity", self.get_similarity),
+            web.get("/meetings/{id}/events", self.events),
+            web.get("/stats", self.stats),
+        ])
+        app.on_startup.append(self.on_startup)
+        app.on_cleanup.append(self.on_cleanup)
+        return app
+
+    async def on_startup(self, app):
+        self.scheduler.start()
+        # Load the models before taking traffic, so no meeting pays for it
+        await asyncio.get_running_loop().run_in_executor(None, classifiers.get_models)
+        logging.info("Classifier models loaded")
+        if self.pool:
+            # Forked before the listening socket exists
+            self.pool.start()
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(POOL_CLIENT_THREADS))
+        # The embedding model loads in the background; reports say so until it is ready
+        self.similarity = EmbeddingService(STANDUP_AGENDA)
+
+    async def on_cleanup(self, app):
+        for meeting in self.meetings.values():
+            meeting.engine.end_meeting()
+            for queue in list(meeting.subscribers):
+                meeting.close_subscriber(queue)
+        self.scheduler.stop()
+        if self.pool:
+            self.pool.close()
+
+    def meeting(self, request):
+        meeting = self.meetings.get(request.match_info["id"])
+        if meeting is None:
+            raise web.HTTPNotFound(text=json.dumps({"error": "no such meeting"}), content_type="application/json")
+        return meeting
+
+    async def body(self, request):
+        if not request.can_read_body:
+            return {}
+        try:
+            body = await request.json()
+        except ValueError:
+            body = None
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text=json.dumps({"error": "body must be a JSON object"}),
+                                     content_type="application/json")
+        return body
+
+    def handle_utterance(self, meeting, text):
+        t0 = time.perf_counter()
+        command = meeting.engine.handle_utterance(text)
+        self.utterance_latency.record(time.perf_counter() - t0)
+        return {"command": list(command) if command else None, "current_speaker": meeting.engine.current_speaker}
+
+    async def run_utterance(self, meeting, text):
+        if self.pool is None:
+            result = self.handle_utterance(meeting, text)
+        else:
+            # Blocks on the worker pool, so it runs in a thread; concurrent meetings end up in one batch
+            result = await asyncio.get_running_loop().run_in_executor(None, self.handle_utterance, meeting, text)
+        # Counted on the event loop, never from the executor threads
+        self.utterances += 1
+        return result
+
+    async def create_meeting(self, request):
+        body = await self.body(request)
+        if self.pool:
+            # The workers tokenize; nothing is classified on the event loop's process
+            engine = MeetingEngine(detect_start_stop=self.pool.detect_start_stop,
+                                   categorize_batch=self.pool.categorize_statements, scheduler=self.scheduler)
+        else:
+            engine = MeetingEngine(detect_start_stop=classifiers.detect_start_stop,
+                                   categorize_batch=classifiers.categorize_statements,
+                                   tokenize=classifiers.tokenize, scheduler=self.scheduler)
+        meeting = Meeting(uuid.uuid4().hex[:12], engine, asyncio.get_running_loop())
+        try:
+            for p in body.get("participants", []):
+                engine.add_participant(p["name"], float(p.get("seconds", DEFAULT_ALLOCATION)))
+            if body.get("start"):
+                engine.start_meeting()
+        except (KeyError, TypeError, ValueError) as e:
+            return error(400, f"invalid meeting: {e}")
+        self.meetings[meeting.id] = meeting
+        return web.json_response(meeting.state(), status=201)
+
+    async def list_meetings(self, request):
+        return web.json_response([{"id": m.id, "created": m.created, "meeting_active": m.engine.meeting_active,
+                                   "participants": len(m.engine.participants)} for m in self.meetings.values()])
+
+    async def get_state(self, request):
+        return web.json_response(self.meeting(request).state())
+
+    async def delete_meeting(self, request):
+        meeting = self.meeting(request)
+        if meeting.engine.meeting_active:
+            meeting.engine.end_meeting()
+        del self.meetings[meeting.id]
+        for queue in list(meeting.subscribers):
+            meeting.close_subscriber(queue)
+        return web.json_response({"id": meeting.id, "deleted": True})
+
+    async def add_participant(self, request):
+        meeting = self.meeting(request)
+        body = await self.body(request)
+        try:
+            name = meeting.engine.add_participant(body["name"], float(body.get("seconds", DEFAULT_ALLOCATION)))
+        except (KeyError, TypeError, ValueError) as e:
+            return error(400, f"invalid participant: {e}")
+        return web.json_response({"name": name}, status=201)
+
+    async def start_meeting(self, request):
+        meeting = self.meeting(request)
+        try:
+            meeting.engine.start_meeting()
+        except ValueError as e:
+            return error(400, str(e))
+        return web.json_response(meeting.state())
+
+    async def end_meeting(self, request):
+        meeting = self.meeting(request)
+        meeting.engine.end_meeting()
+        return web.json_response(await meeting.summary())
+
+    async def post_utterance(self, request):
+        meeting = self.meeting(request)
+        body = await self.body(request)
+        text = body.get("text")
+        if not isinstance(text, str):
+            return error(400, "text is required")
+        return web.json_response(await self.run_utterance(meeting, text))
+
+    async def post_audio(self, request):
+        meeting = self.meeting(request)
+        try:
+            sample_rate = int(request.query.get("sample_rate", 16000))
+            sample_width = int(request.query.get("sample_width", 2))
+        except ValueError:
+            return error(400, "sample_rate and sample_width must be integers")
+        pcm = await request.read()
+        try:
+            text = await asyncio.get_running_loop().run_in_executor(None, recognize_pcm, pcm, sample_rate,
+                                                                     sample_width)
+        except ImportError:
+            return error(503, "speech_recognition is not installed on the server")
+        except Exception as e:
+            logging.error(f"Meeting {meeting.id}: recognition failed: {e}")
+            return error(502, f"recognition failed: {e}")
+        if not text:
+            return web.json_response({"text": None, "command": None})
+        return web.json_response({"text": text, **(await self.run_utterance(meeting, text))})
+
+    async def get_summary(self, request):
+        return web.json_response(await self.meeting(request).summary())
+
+    async def get_similarity(self, request):
+        return web.json_response(await self.meeting(request).similarity_report(self.similarity))
+
+    async def events(self, request):
+        meeting = self.meeting(request)
+        ws = web.WebSocketResponse(heartbeat=30)
+        await ws.prepare(request)
+        queue = asyncio.Queue(SUBSCRIBER_QUEUE)
+        meeting.subscribers.add(queue)
+        queue.put_nowait({"meeting": meeting.id, "event": "snapshot", "t": time.time(), "data": meeting.state()})
+        sender = asyncio.create_task(self._send_events(ws, queue))
+        try:
+            async for msg in ws:
+                if msg.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    text = json.loads(msg.data)["text"]
+                    if not isinstance(text, str):
+                        raise TypeError("text must be a string")
+                except (ValueError, KeyError, TypeError):
+                    await queue.put({"event": "error", "data": {"error": 'expected {"text": ...}'}})
+                    continue
+                reply = {"meeting": meeting.id, "event": "utterance_handled", "t": time.time(),
+                         "data": await self.run_utterance(meeting, text)}
+                # The events this utterance caused are already scheduled with call_soon_threadsafe;
+                # yield once so they are queued first and the reply follows them on the socket
+                await asyncio.sleep(0)
+                await queue.put(reply)
+        finally:
+            meeting.subscribers.discard(queue)
+            sender.cancel()
+        return ws
+
+    async def _send_events(self, ws, queue):
+        while True:
+            message = await queue.get()
+            if message is None:
+                await ws.close()
+                return
+            await ws.send_str(json.dumps(message))
+
+    async def stats(self, request):
+        latency = self.utterance_latency.summary()
+        return web.json_response({
+            "uptime_s": round(time.time() - self.started, 1),
+            "meetings": len(self.meetings),
+            "active_meetings": sum(1 for m in self.meetings.values() if m.engine.meeting_active),
+            "subscribers": sum(len(m.subscribers) for m in self.meetings.values()),
+            "pending_timers": len(self.scheduler),
+            "utterances": self.utterances,
+            "utterance_latency_ms": {k: round(v * 1000, 3) for k, v in latency.items() if k != "count"},
+            "classifier_cache": classifiers.result_cache.stats(),
+            "similarity_model": self.similarity.status_text() if self.similarity else None,
+            "worker_pool": self.pool.stats() if self.pool else None,
+        })
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host many meetings at once over a local HTTP/WebSocket API.")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="classify in this many forked worker processes (0 = in the server process)")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+    logging.basicConfig(level=args.log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    web.run_app(MeetingService(args.workers).app(), host=args.host, port=args.port)
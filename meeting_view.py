@@ -0,0 +1,88 @@
+import threading
+import time
+
+from meeting_engine import ParticipantState
+
+FRAME_MS = 16
+TICK_MS = 1000
+
+ROW_EVENTS = ("participant_added", "participant_removed", "speaker_started", "speaker_stopped",
+              "time_warning", "time_exceeded")
+
+def format_used(seconds):
+    seconds = int(seconds)
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+class MeetingTreeView:
+    """Keeps the meeting Treeview in sync with a MeetingEngine.
+
+    Engine events only mark rows dirty, from whatever thread they arrive on
+    and often with engine.lock held, so they never call into Tk. A root.after
+    loop on the Tk thread rewrites the dirty rows once per frame, and only the
+    cells whose text changed. While someone is speaking their Used Time cell
+    ticks once a second without touching the other rows.
+    """
+
+    def __init__(self, root, tree, engine):
+        self.root = root
+        self.tree = tree
+        self.engine = engine
+        self.rows = {}
+        self.dirty = set()
+        self.all_dirty = False
+        self.lock = threading.Lock()
+        self.next_tick = None
+        engine.subscribe(self.on_engine_event)
+        self.root.after(FRAME_MS, self.poll)
+
+    def on_engine_event(self, event, data):
+        with self.lock:
+            if event in ROW_EVENTS:
+                self.dirty.add(data["name"])
+            elif event in ("meeting_started", "meeting_ended", "restored"):
+                self.all_dirty = True
+
+    def mark_dirty(self, *names):
+        with self.lock:
+            self.dirty.update(names)
+
+    def row_values(self, name, pdata):
+        used = self.engine.used_time(name) if pdata["state"] == ParticipantState.SPEAKING else pdata["T_used"]
+        return (name, pdata["state"].name, format_used(used), format_used(pdata["T_alloc"]))
+
+    def poll(self):
+        now = time.monotonic()
+        speaker = self.engine.current_speaker
+        if not self.engine.meeting_active or speaker is None:
+            self.next_tick = None
+        elif self.next_tick is None:
+            self.next_tick = now + TICK_MS / 1000
+        elif now >= self.next_tick:
+            self.mark_dirty(speaker)
+            self.next_tick = max(self.next_tick + TICK_MS / 1000, now)
+        self.flush()
+        self.root.after(FRAME_MS, self.poll)
+
+    def flush(self):
+        # Tk thread only; the engine lock is held to read the rows but never while the tree is driven
+        with self.lock:
+            dirty, self.dirty = self.dirty, set()
+            all_dirty, self.all_dirty = self.all_dirty, False
+        if not dirty and not all_dirty:
+            return
+        with self.engine.lock:
+            if all_dirty:
+                dirty.update(self.rows, self.engine.participants)
+            # Participant order, so rows inserted in one flush keep the meeting order
+            updates = [(name, self.row_values(name, pdata))
+                       for name, pdata in self.engine.participants.items() if name in dirty]
+        for name in dirty.difference(name for name, _ in updates):
+            if self.rows.pop(name, None) is not None:
+                self.tree.delete(name)
+        for name, values in updates:
+            if name not in self.rows:
+                self.tree.insert('', 'end', iid=name, values=values)
+                self.rows[name] = values
+            elif self.rows[name] != values:
+                self.tree.item(name, values=values)
+                self.rows[name] = values
@@ -0,0 +1,58 @@
+import bisect
+import math
+import threading
+
+class LatencyHistogram:
+    """Latency samples in log-spaced buckets.
+
+    Memory is fixed regardless of how many samples are recorded; percentiles
+    are reported as the upper edge of the bucket they fall in, so they are
+    accurate to one bucket width (about 12% with 20 buckets per decade).
+    """
+
+    def __init__(self, min_seconds=1e-5, max_seconds=60.0, buckets_per_decade=20):
+        decades = math.log10(max_seconds / min_seconds)
+        n = int(math.ceil(decades * buckets_per_decade))
+        self.edges = [min_seconds * 10 ** (i / buckets_per_decade) for i in range(n + 1)]
+        # counts[i] holds samples <= edges[i]; the last slot is overflow
+        self.counts = [0] * (len(self.edges) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.counts[bisect.bisect_left(self.edges, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, pct):
+        with self.lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, math.ceil(pct / 100 * self.count))
+            seen = 0
+            for i, n in enumerate(self.counts):
+                seen += n
+                if seen >= rank:
+                    return min(self.edges[i], self.max) if i < len(self.edges) else self.max
+            return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+    def summary_text(self, label):
+        s = self.summary()
+        if not s["count"]:
+            return f"{label}: no samples"
+        return (f"{label}: p50 {s['p50'] * 1000:.1f} ms, p99 {s['p99'] * 1000:.1f} ms, "
+                f"max {s['max'] * 1000:.1f} ms (n={s['count']})")
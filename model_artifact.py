@@ -0,0 +1,429 @@
+import functools
+import json
+import math
+import mmap
+import re
+import struct
+import sys
+import zlib
+from collections import Counter
+from operator import mul
+
+import numpy as np
+
+# Pickle-free model file for a word TF-IDF (or hashing) vectorizer + linear classifier:
+#
+#   magic (8 bytes) | format version (uint32) | header length (uint32)
+#   header JSON (classes, tokenizer/tf settings, feature kind, section table)
+#   64-byte aligned raw sections:
+#     coef           float32 (n_features, n_rows)  token-major classifier weights
+#     intercept      float32 (n_rows,)
+#     idf            float32 (n_features,)         absent when use_idf is False
+#     fused          float32 (n_features, n_rows)  coef scaled by idf, for per-statement scoring; absent without idf
+#     vocab_offsets  uint32  (n_features + 1,)     byte offsets into vocab_blob, by feature index
+#     vocab_blob     uint8                         UTF-8 terms, concatenated
+#     vocab_hash     uint32  (table_size,)         open-addressing table of feature index + 1
+#
+# Version 2 adds header["features"]: {"kind": "vocabulary"} as above, or
+# {"kind": "hashing", ...} for HashingVectorizer models, which have no vocab
+# sections and map tokens to columns with MurmurHash3 like sklearn does.
+#
+# header["corrections"], when present, is how many corrections.jsonl records
+# the model was trained with; classifiers only replays the records after them.
+#
+# The file is opened with mmap, so loading costs a few page faults and every
+# process that opens the same file shares one physical copy of the weights.
+
+MAGIC = b"MMLINEAR"
+FORMAT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+ALIGN = 64
+MASK32 = 0xffffffff
+# Per-model token -> feature cache; bounded because hashed models accept any token
+TOKEN_CACHE_SIZE = 100000
+
+def murmurhash3_32(data, seed=0):
+    """Signed 32-bit MurmurHash3 of bytes, identical to sklearn.utils.murmurhash3_32."""
+    c1, c2 = 0xcc9e2d51, 0x1b873593
+    h = seed & MASK32
+    n_blocks = len(data) // 4
+    for i in range(0, n_blocks * 4, 4):
+        k = int.from_bytes(data[i:i + 4], "little")
+        k = (k * c1) & MASK32
+        k = ((k << 15) | (k >> 17)) & MASK32
+        h ^= (k * c2) & MASK32
+        h = ((h << 13) | (h >> 19)) & MASK32
+        h = (h * 5 + 0xe6546b64) & MASK32
+    tail = data[n_blocks * 4:]
+    k = 0
+    if len(tail) == 3:
+        k ^= tail[2] << 16
+    if len(tail) >= 2:
+        k ^= tail[1] << 8
+    if tail:
+        k ^= tail[0]
+        k = (k * c1) & MASK32
+        k = ((k << 15) | (k >> 17)) & MASK32
+        h ^= (k * c2) & MASK32
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85ebca6b) & MASK32
+    h ^= h >> 13
+    h = (h * 0xc2b2ae35) & MASK32
+    h ^= h >> 16
+    return h - (1 << 32) if h & 0x80000000 else h
+
+@functools.lru_cache(maxsize=65536)
+def hashed_feature(token, n_features, alternate_sign):
+    # Column and sign exactly as sklearn's HashingVectorizer computes them
+    h = murmurhash3_32(token.encode("utf-8"))
+    if h == -2147483648:
+        idx = (2147483647 - (n_features - 1)) % n_features
+    else:
+        idx = abs(h) % n_features
+    return idx, (1 if h >= 0 or not alternate_sign else -1)
+
+def _term_hash(term_bytes):
+    return zlib.crc32(term_bytes)
+
+def _build_hash_table(terms):
+    size = 1
+    while size < 2 * len(terms):
+        size *= 2
+    mask = size - 1
+    table = np.zeros(size, dtype=np.uint32)
+    for idx, term in enumerate(terms):
+        slot = _term_hash(term) & mask
+        while table[slot]:
+            slot = (slot + 1) & mask
+        table[slot] = idx + 1
+    return table
+
+def analyzer_config(vectorizer):
+    params = vectorizer.get_params()
+    if params["analyzer"] != "word" or params["preprocessor"] is not None or params["tokenizer"] is not None:
+        raise ValueError("Only the built-in word analyzer can be exported")
+    if params["strip_accents"] is not None:
+        raise ValueError("strip_accents is not supported by the artifact tokenizer")
+    stop_words = vectorizer.get_stop_words()
+    return {
+        "lowercase": params["lowercase"],
+        "token_pattern": params["token_pattern"],
+        "ngram_range": list(params["ngram_range"]),
+        "stop_words": sorted(stop_words) if stop_words else None,
+    }
+
+def export_model(vectorizer, clf, path, corrections=None):
+    params = vectorizer.get_params()
+    analyzer = analyzer_config(vectorizer)
+
+    # SGDClassifier and liblinear score each class independently
+    solver_ovr = (getattr(clf, "multi_class", "auto") == "ovr" or getattr(clf, "solver", "") == "liblinear"
+                  or not hasattr(clf, "solver"))
+    sections = [
+        ("coef", np.ascontiguousarray(clf.coef_.T, dtype=np.float32)),
+        ("intercept", np.asarray(clf.intercept_, dtype=np.float32)),
+    ]
+    if hasattr(vectorizer, "vocabulary_"):
+        n_features = len(vectorizer.vocabulary_)
+        terms = [None] * n_features
+        for term, idx in vectorizer.vocabulary_.items():
+            terms[idx] = term.encode("utf-8")
+        offsets = np.zeros(n_features + 1, dtype=np.uint32)
+        offsets[1:] = np.cumsum([len(term) for term in terms])
+        sections += [
+            ("vocab_offsets", offsets),
+            ("vocab_blob", np.frombuffer(b"".join(terms), dtype=np.uint8)),
+            ("vocab_hash", _build_hash_table(terms)),
+        ]
+        features = {"kind": "vocabulary"}
+    else:
+        features = {"kind": "hashing", "n_features": params["n_features"], "alternate_sign": params["alternate_sign"]}
+    use_idf = params.get("use_idf", False)
+    if use_idf:
+        sections.append(("idf", np.asarray(vectorizer.idf_, dtype=np.float32)))
+        # idf folded into the weights, so scoring a token is one row lookup
+        sections.append(("fused", np.ascontiguousarray(clf.coef_.T * vectorizer.idf_[:, None], dtype=np.float32)))
+
+    header = {
+        "classes": [str(c) for c in clf.classes_],
+        "multi_class": "ovr" if solver_ovr else "multinomial",
+        "analyzer": analyzer,
+        "features": features,
+        "tf": {
+            "binary": params["binary"],
+            "sublinear_tf": params.get("sublinear_tf", False),
+            "use_idf": use_idf,
+            "norm": params["norm"],
+        },
+        "sections": {},
+    }
+    if corrections is not None:
+        header["corrections"] = corrections
+
+    # Section offsets depend on the header length, which depends on the offsets;
+    # iterate until the layout is stable.
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, array in sections:
+            header["sections"][name] = {"dtype": array.dtype.str, "shape": list(array.shape), "offset": offset}
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+        header_bytes = json.dumps(header, sort_keys=True).encode("utf-8")
+        needed = -(-(len(MAGIC) + 8 + len(header_bytes)) // ALIGN) * ALIGN
+        if needed == data_start:
+            break
+        data_start = needed
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<II", FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in sections:
+            f.seek(header["sections"][name]["offset"])
+            f.write(array.tobytes())
+        f.truncate(offset)
+
+def build_analyzer(config):
+    # Same token stream as sklearn's word analyzer for the exported settings
+    pattern = re.compile(config["token_pattern"])
+    lowercase = config["lowercase"]
+    min_n, max_n = config["ngram_range"]
+    stop_words = frozenset(config["stop_words"] or ())
+
+    def analyze(doc):
+        if lowercase:
+            doc = doc.lower()
+        tokens = pattern.findall(doc)
+        if stop_words:
+            tokens = [t for t in tokens if t not in stop_words]
+        if max_n == 1:
+            return tokens
+        original = tokens
+        tokens = list(original) if min_n == 1 else []
+        n_original = len(original)
+        for n in range(max(min_n, 2), min(max_n, n_original) + 1):
+            for i in range(n_original - n + 1):
+                tokens.append(" ".join(original[i:i + n]))
+        return tokens
+
+    return analyze
+
+class LinearTextModel:
+    """Read-only TF-IDF + linear classifier backed by a memory-mapped artifact.
+
+    Single statements are scored in plain Python: each distinct token is
+    resolved once to its feature index and its row of idf-scaled weights,
+    and both are cached, so a warm prediction is a handful of float
+    multiply-adds per token with no numpy or scipy call in the loop.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a model artifact")
+        version, header_len = struct.unpack_from("<II", self._mm, len(MAGIC))
+        if version not in READABLE_VERSIONS:
+            raise ValueError(f"{path} has artifact version {version}, expected one of {READABLE_VERSIONS}")
+        start = len(MAGIC) + 8
+        self.header = json.loads(self._mm[start:start + header_len].decode("utf-8"))
+        self.classes = self.header["classes"]
+        self.analyzer_config = self.header["analyzer"]
+        self.tf_config = self.header["tf"]
+        self.multi_class = self.header["multi_class"]
+        self.corrections = self.header.get("corrections")
+        self.tokenize = build_analyzer(self.analyzer_config)
+
+        self.coef = self._section("coef")
+        self.intercept = self._section("intercept")
+        self.idf = self._section("idf") if "idf" in self.header["sections"] else None
+        self.feature_config = self.header.get("features", {"kind": "vocabulary"})
+        self.hashed = self.feature_config["kind"] == "hashing"
+        if self.hashed:
+            self.n_features = self.feature_config["n_features"]
+            self._alternate_sign = self.feature_config["alternate_sign"]
+        else:
+            # memoryviews give fast scalar reads for the per-token hash lookups
+            self._offsets = memoryview(self._section("vocab_offsets")).cast("B").cast("I")
+            self._table = memoryview(self._section("vocab_hash")).cast("B").cast("I")
+            self._blob_start = self.header["sections"]["vocab_blob"]["offset"]
+            self._mask = len(self._table) - 1
+            self.n_features = len(self._offsets) - 1
+
+        if "fused" in self.header["sections"]:
+            self.fused = self._section("fused")
+        elif self.idf is not None:
+            # Version 1 artifacts: fold idf in once at load
+            self.fused = self.coef * self.idf[:, None]
+        else:
+            self.fused = self.coef
+        self._tokens = {}
+        self._intercept = self.intercept.tolist()
+
+    def _section(self, name):
+        info = self.header["sections"][name]
+        dtype = np.dtype(info["dtype"])
+        count = int(np.prod(info["shape"]))
+        array = np.frombuffer(self._mm, dtype=dtype, count=count, offset=info["offset"])
+        return array.reshape(info["shape"])
+
+    def feature_index(self, token):
+        term = token.encode("utf-8")
+        slot = _term_hash(term) & self._mask
+        table, offsets, mm, base = self._table, self._offsets, self._mm, self._blob_start
+        while True:
+            entry = table[slot]
+            if not entry:
+                return None
+            idx = entry - 1
+            if mm[base + offsets[idx]:base + offsets[idx + 1]] == term:
+                return idx
+            slot = (slot + 1) & self._mask
+
+    def features(self, tokens):
+        counts = {}
+        if self.hashed:
+            for token in tokens:
+                idx, sign = hashed_feature(token, self.n_features, self._alternate_sign)
+                counts[idx] = counts.get(idx, 0) + sign
+        else:
+            for token in tokens:
+                idx = self.feature_index(token)
+                if idx is not None:
+                    counts[idx] = counts.get(idx, 0) + 1
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        tf = self.tf_config
+        if tf["binary"]:
+            values.fill(1)
+        if tf["sublinear_tf"]:
+            values = np.log(values) + 1
+        if self.idf is not None:
+            values *= self.idf[indices]
+        if tf["norm"] == "l2":
+            norm = np.sqrt(np.dot(values, values))
+        elif tf["norm"] == "l1":
+            norm = np.abs(values).sum()
+        else:
+            norm = 0
+        if norm:
+            values /= norm
+        return indices, values
+
+    def make_writable(self):
+        """Copy the weights out of the read-only mmap so they can be updated in place."""
+        self.coef = np.array(self.coef)
+        self.intercept = np.array(self.intercept)
+        self.fused = np.array(self.fused) if self.idf is not None else self.coef
+
+    def weights_changed(self, indices):
+        # After coef/intercept were updated in place: refresh the fused rows and drop their cached copies
+        if self.idf is not None:
+            self.fused[indices] = self.coef[indices] * self.idf[indices, None]
+        self._tokens.clear()
+        self._intercept = self.intercept.tolist()
+
+    def _token_entry(self, token):
+        # (feature index, sign, fused weight row, weight in the norm), or None if the token has no feature
+        if self.hashed:
+            idx, sign = hashed_feature(token, self.n_features, self._alternate_sign)
+        else:
+            idx, sign = self.feature_index(token), 1
+        entry = None
+        if idx is not None:
+            weight = float(self.idf[idx]) if self.idf is not None else 1.0
+            entry = (idx, sign, self.fused[idx].tolist(), weight * weight if self.tf_config["norm"] == "l2" else weight)
+        if len(self._tokens) >= TOKEN_CACHE_SIZE:
+            self._tokens.clear()
+        self._tokens[token] = entry
+        return entry
+
+    def scores(self, tokens):
+        """Decision scores for one statement, same as decision_function but without numpy."""
+        cache = self._tokens
+        features = {}
+        for token, count in Counter(tokens).items():
+            entry = cache[token] if token in cache else self._token_entry(token)
+            if entry is None:
+                continue
+            idx, sign, row, weight = entry
+            if idx in features:
+                # Hash collision: the two tokens share one column
+                features[idx][0] += sign * count
+            else:
+                features[idx] = [sign * count, row, weight]
+
+        tf = self.tf_config
+        binary, sublinear, norm_kind = tf["binary"], tf["sublinear_tf"], tf["norm"]
+        values, rows = [], []
+        norm = 0.0
+        for value, row, weight in features.values():
+            if not value:
+                continue
+            if binary:
+                value = 1
+            elif sublinear:
+                value = math.log(value) + 1
+            if norm_kind == "l2":
+                norm += value * value * weight
+            elif norm_kind == "l1":
+                norm += abs(value) * weight
+            values.append(value)
+            rows.append(row)
+        if not rows:
+            return list(self._intercept)
+        if norm_kind == "l2":
+            norm = math.sqrt(norm)
+        scale = 1 / norm if norm else 1.0
+        return [sum(map(mul, values, column)) * scale + b for column, b in zip(zip(*rows), self._intercept)]
+
+    def decision_function(self, tokens):
+        indices, values = self.features(tokens)
+        return values @ self.coef[indices] + self.intercept
+
+    def probabilities(self, scores):
+        if len(scores) == 1:
+            p = _sigmoid(scores[0])
+            return [1 - p, p]
+        if self.multi_class == "ovr":
+            p = [_sigmoid(s) for s in scores]
+        else:
+            top = max(scores)
+            p = [math.exp(s - top) for s in scores]
+        total = sum(p)
+        return [x / total for x in p]
+
+    def label(self, scores):
+        if len(scores) == 1:
+            return self.classes[int(scores[0] > 0)]
+        return self.classes[max(range(len(scores)), key=scores.__getitem__)]
+
+    def classify(self, tokens):
+        """Return (label, probabilities in classes order) for one tokenized statement."""
+        scores = self.scores(tokens)
+        return self.label(scores), self.probabilities(scores)
+
+    def predict_proba(self, token_lists):
+        return [np.array(self.probabilities(self.scores(tokens))) for tokens in token_lists]
+
+    def predict(self, token_lists):
+        return [self.label(self.scores(tokens)) for tokens in token_lists]
+
+def _sigmoid(x):
+    if x >= 0:
+        return 1 / (1 + math.exp(-x))
+    e = math.exp(x)
+    return e / (1 + e)
+
+def load_model(path):
+    return LinearTextModel(path)
+
+if __name__ == "__main__":
+    import joblib
+    if len(sys.argv) != 4:
+        print("usage: python model_artifact.py VECTORIZER.joblib CLASSIFIER.joblib OUTPUT")
+        sys.exit(1)
+    export_model(joblib.load(sys.argv[1]), joblib.load(sys.argv[2]), sys.argv[3])
+    print(f"Wrote {sys.argv[3]}")
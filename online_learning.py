@@ -0,0 +1,167 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+
+CORRECTIONS_PATH = "corrections.jsonl"
+# Small steps, stopping as soon as the label flips, so a correction moves the model no further than needed
+LEARNING_RATE = 0.1
+MAX_STEPS = 20
+# Largest L2 change one correction may make to the weight rows of its tokens; a statement the
+# model still gets wrong after that is left to the exact-text override and the next training run
+MAX_CHANGE = 1.0
+
+def sgd_step(coef, intercept, indices, values, target, multi_class, learning_rate=LEARNING_RATE):
+    """One log-loss gradient step on a single example, touching only the rows of its tokens.
+
+    coef is token-major (n_features, n_rows), as in the artifact; target is
+    the class index. The intercept is read but never stepped: it is shared
+    by every prediction. Returns the class probabilities before the step.
+    """
+    import numpy as np
+    scores = values @ coef[indices] + intercept
+    if len(scores) == 1:
+        # Binary models keep one column, positive for classes[1]
+        p = 1 / (1 + np.exp(-scores))
+        error = p - (target == 1)
+        probs = np.array([1 - p[0], p[0]])
+    else:
+        if multi_class == "ovr":
+            p = 1 / (1 + np.exp(-scores))
+            probs = p / p.sum()
+        else:
+            e = np.exp(scores - scores.max())
+            p = probs = e / e.sum()
+        error = p.copy()
+        error[target] -= 1
+    coef[indices] -= learning_rate * np.outer(values, error)
+    return probs
+
+class OnlineModel:
+    """Wraps a LinearTextModel or SklearnTextModel and applies corrections to it in place.
+
+    The first correction copies the weights out of the read-only mmap (or
+    pickle); after that each one is a few SGD steps over the rows of the
+    corrected statement's tokens, until the model predicts the new label or
+    the rows have moved max_change (the intercept is never touched).
+    version goes up with every applied correction, so anything caching
+    predictions can tell stale results apart.
+    """
+
+    def __init__(self, model, learning_rate=LEARNING_RATE, max_steps=MAX_STEPS, max_change=MAX_CHANGE):
+        self.model = model
+        self.learning_rate = learning_rate
+        self.max_steps = max_steps
+        self.max_change = max_change
+        self.version = 0
+        self.lock = threading.Lock()
+        self.classes = model.classes
+        self.analyzer_config = model.analyzer_config
+        self.tokenize = model.tokenize
+        self._weights = None
+
+    def __getattr__(self, name):
+        return getattr(self.model, name)
+
+    def predict(self, token_lists):
+        return self.model.predict(token_lists)
+
+    def predict_proba(self, token_lists):
+        return self.model.predict_proba(token_lists)
+
+    def _writable_weights(self):
+        # Copy on write: nothing is copied until the first correction
+        if self._weights is None:
+            import numpy as np
+            model = self.model
+            if hasattr(model, "clf"):
+                model.clf.coef_ = np.array(model.clf.coef_, dtype=np.float64)
+                model.clf.intercept_ = np.array(model.clf.intercept_, dtype=np.float64)
+                multi_class = "ovr" if getattr(model.clf, "multi_class", "auto") == "ovr" or \
+                    getattr(model.clf, "solver", "") == "liblinear" or not hasattr(model.clf, "solver") else "multinomial"
+                self._weights = (model.clf.coef_.T, model.clf.intercept_, multi_class)
+            else:
+                model.make_writable()
+                self._weights = (model.coef, model.intercept, model.multi_class)
+        return self._weights
+
+    def _features(self, tokens):
+        if hasattr(self.model, "clf"):
+            from classifiers import vectorize_tokens
+            X = vectorize_tokens(self.model.vectorizer, [tokens])
+            return X.indices, X.data
+        return self.model.features(tokens)
+
+    def learn(self, tokens, label):
+        """Move the model towards predicting label for tokens; return the number of steps taken."""
+        if label not in self.classes:
+            raise ValueError(f"Unknown label {label!r}; expected one of {self.classes}")
+        target = self.classes.index(label)
+        indices, values = self._features(tokens)
+        if not len(indices):
+            # No known token: the only thing a step could move is what every prediction shares
+            return 0
+        import numpy as np
+        steps = 0
+        with self.lock:
+            coef, intercept, multi_class = self._writable_weights()
+            before = coef[indices].copy()
+            while steps < self.max_steps:
+                sgd_step(coef, intercept, indices, values, target, multi_class, self.learning_rate)
+                steps += 1
+                change = np.linalg.norm(coef[indices] - before)
+                if change > self.max_change:
+                    coef[indices] = before + (coef[indices] - before) * (self.max_change / change)
+                if hasattr(self.model, "weights_changed"):
+                    # The artifact scores from idf-scaled copies of these rows
+                    self.model.weights_changed(indices)
+                if change >= self.max_change or self.predict([tokens])[0] == label:
+                    break
+            self.version += 1
+        return steps
+
+class CorrectionLog:
+    """Append-only JSONL of moderator corrections, folded in by the training scripts."""
+
+    def __init__(self, path=CORRECTIONS_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def append(self, model, text, label):
+        record = {"t": time.time(), "model": model, "text": text, "label": label}
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+def count_corrections(path=CORRECTIONS_PATH):
+    """Number of records in the log; the training scripts store it in the model artifact."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in f)
+
+def read_corrections(model, path=CORRECTIONS_PATH, skip=0):
+    """Return [(text, label)] for one model ("category" or "startstop"), latest correction per text.
+
+    The first skip records of the log (for every model) are ignored.
+    """
+    if not os.path.exists(path):
+        return []
+    latest = {}
+    with open(path, encoding="utf-8") as f:
+        for line in itertools.islice(f, skip, None):
+            try:
+                record = json.loads(line)
+            except ValueError:
+                logging.warning(f"Skipping malformed correction in {path}")
+                continue
+            if record["model"] == model:
+                latest[record["text"]] = record["label"]
+    return list(latest.items())
+
+def corrections_frame(model, path=CORRECTIONS_PATH):
+    import pandas as pd
+    return pd.DataFrame(read_corrections(model, path), columns=["text", "label"])
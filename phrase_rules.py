@@ -0,0 +1,128 @@
+from collections import namedtuple, deque
+
+HIGH = "high"
+LOW = "low"
+
+# kind: what a hit means to the consumer
+#   start / stop                 live start/stop detection in MeetingEngine
+#   label_start / label_stop     weak labels in prepare_labeled_data.py
+#   today_override               category override for statements the model calls "blocker"
+# confidence: HIGH hits decide start/stop on their own and skip the classifier
+# anchored: only counts when the phrase begins the statement
+PhraseRule = namedtuple("PhraseRule", ["phrase", "kind", "confidence", "anchored"])
+Hit = namedtuple("Hit", ["start", "rule"])
+
+def _rules(kind, confidence, phrases, anchored=False):
+    return [PhraseRule(phrase, kind, confidence, anchored) for phrase in phrases]
+
+RULES = (
+    _rules("start", LOW, ["start", "begin"])
+    + _rules("start", HIGH, ["you can start", "your turn"])
+    + _rules("stop", LOW, ["finished"])
+    + _rules("stop", HIGH, [
+        "i'm done", "that's it", "no more updates", "that's all", "i have nothing else",
+        "i am finished", "done for now", "that concludes", "that is all"
+    ])
+    + _rules("label_start", HIGH, [
+        "let me begin", "i will start", "i am starting", "starting now", "i'll start", "my update",
+        "i'd like to start", "i'd like to begin", "let's start", "let's begin", "i'd like to start the meeting",
+        "i'd like to start our daily standup meeting", "good morning, team. i'd like to start",
+        "good morning, team. let's start", "i will start my update"
+    ])
+    + _rules("label_stop", HIGH, [
+        "i'm done", "that's it", "finished", "no more updates", "that's all", "i have nothing else",
+        "i am finished", "done for now", "that concludes", "that is all", "thank you",
+        "thank you for your participation", "okay, that's all", "that's it for today",
+        "that's all for today", "keep up the good work", "meeting adjourned", "we'll meet again tomorrow"
+    ])
+    + _rules("today_override", HIGH, ["today"])
+    + _rules("today_override", HIGH, ["i will", "i'm going to"], anchored=True)
+)
+
+class PhraseAutomaton:
+    """Aho-Corasick automaton over a fixed rule set.
+
+    scan() walks the text once and returns every rule hit, so the cost is
+    linear in the text length plus the number of hits, independent of how
+    many phrases are registered.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for rule in self.rules:
+            state = 0
+            for ch in rule.phrase:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = nxt
+            self.output[state].append(rule)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[nxt] = self.goto[fallback].get(ch, 0)
+                self.output[nxt] = self.output[nxt] + self.output[self.fail[nxt]]
+
+    def scan(self, text):
+        goto, fail, output = self.goto, self.fail, self.output
+        hits = []
+        state = 0
+        for pos, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for rule in output[state]:
+                start = pos - len(rule.phrase) + 1
+                if rule.anchored and start != 0:
+                    continue
+                hits.append(Hit(start, rule))
+        return hits
+
+# Compiled once at import and shared by the live app and the labeling script
+AUTOMATON = PhraseAutomaton(RULES)
+
+def scan(text):
+    return AUTOMATON.scan(text)
+
+def kinds(hits):
+    return {hit.rule.kind for hit in hits}
+
+def start_stop_hits(text):
+    """Return (is_start, is_stop, decisive) from the live start/stop rules.
+
+    decisive is True when a HIGH confidence rule fired, in which case the
+    classifier does not need to run.
+    """
+    is_start = is_stop = decisive = False
+    for hit in scan(text):
+        kind = hit.rule.kind
+        if kind == "start":
+            is_start = True
+        elif kind == "stop":
+            is_stop = True
+        else:
+            continue
+        if hit.rule.confidence == HIGH:
+            decisive = True
+    return is_start, is_stop, decisive
+
+def label_start_stop(text):
+    found = kinds(scan(text.lower().strip()))
+    if "label_start" in found:
+        return "start"
+    if "label_stop" in found:
+        return "stop"
+    return "other"
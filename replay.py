@@ -0,0 +1,221 @@
+import argparse
+import csv
+import logging
+import os
+import re
+import time
+from collections import namedtuple
+
+from meeting_engine import MeetingEngine
+from scheduler import Scheduler
+from transcripts import MOM_DATASET, TRANSCRIPT_COLUMN, iter_transcripts
+
+Utterance = namedtuple("Utterance", ["speaker", "text", "start", "end"])
+ReplayResult = namedtuple("ReplayResult", ["engine", "events", "duration", "utterances"])
+
+MODERATORS = {"manager", "scrum master", "team lead", "moderator"}
+WORDS_PER_MINUTE = 150
+PAUSE_SECONDS = 1.0
+START_CUE = "{name}, you can start"
+STOP_CUE = "that's all from me"
+
+# Optional "[mm:ss]" / "[hh:mm:ss]" prefix on transcript lines
+TIMESTAMP_RE = re.compile(r"^\[?(\d+):(\d{2})(?::(\d{2}))?\]?\s+")
+# The labeled CSV is a flat list of lines; a meeting ends on the moderator's closing remark
+CLOSING_RE = re.compile(r"that'?s (it|all) for today|keep up the good work|have a (productive|great|good) day")
+
+class VirtualClock:
+    """Drop-in for time.time that only moves when told to."""
+
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def sleep(self, seconds):
+        self.advance(seconds)
+
+def split_speaker(line):
+    speaker, sep, text = line.partition(":")
+    if not sep or len(speaker) > 40:
+        return None, line.strip()
+    return speaker.strip(" *").lower(), text.strip(" *")
+
+def timestamp_lines(lines, words_per_minute=WORDS_PER_MINUTE, pause=PAUSE_SECONDS):
+    """Turn "Speaker: text" lines into Utterances.
+
+    Lines that carry their own [mm:ss] prefix keep it; otherwise the start
+    time is synthesized from the previous line's word count at the given
+    speaking rate.
+    """
+    utterances = []
+    t = 0.0
+    for line in lines:
+        match = TIMESTAMP_RE.match(line)
+        if match:
+            parts = [int(p) for p in match.groups() if p is not None]
+            seconds = 0
+            for part in parts:
+                seconds = seconds * 60 + part
+            t = max(t, float(seconds))
+            line = line[match.end():]
+        speaker, text = split_speaker(line)
+        if not text:
+            continue
+        duration = len(text.split()) / words_per_minute * 60
+        utterances.append(Utterance(speaker, text, t, t + duration))
+        t += duration + pause
+    return utterances
+
+def load_mom_meetings(source=MOM_DATASET):
+    """Yield the transcript lines of each MOM-Summary-Dataset meeting (see transcripts.iter_raw_transcripts)."""
+    for lines, _ in iter_transcripts(source):
+        yield lines
+
+def load_labeled_meetings(path="category_labeled.csv"):
+    """Yield the lines of category_labeled.csv grouped back into meetings."""
+    meeting = []
+    with open(path, newline="") as f:
+        for row in csv.DictReader(f):
+            line = row["text"]
+            meeting.append(line)
+            speaker, text = split_speaker(line)
+            if speaker in MODERATORS and CLOSING_RE.search(text.lower()):
+                yield meeting
+                meeting = []
+    if meeting:
+        yield meeting
+
+def load_meetings(source):
+    if source.endswith(".csv") and os.path.exists(source):
+        with open(source, newline="") as f:
+            header = next(csv.reader(f), [])
+        if TRANSCRIPT_COLUMN not in header:
+            return load_labeled_meetings(source)
+    return load_mom_meetings(source)
+
+def run_clock_to(scheduler, clock, t):
+    # Jump straight from one timer deadline to the next instead of ticking once a second
+    while True:
+        deadline = scheduler.next_deadline()
+        if deadline is None or deadline > t:
+            break
+        clock.now = max(clock.now, deadline)
+        scheduler.run_due()
+    clock.now = max(clock.now, t)
+
+def replay_meeting(utterances, make_engine, allocated_seconds=120, moderators=MODERATORS, cues=True):
+    """Replay one timestamped meeting through a fresh engine on a VirtualClock.
+
+    Non-moderator speakers become participants. With cues, the moderator's
+    start and stop phrases are injected at every change of speaker, as the
+    transcripts rarely contain them verbatim.
+    """
+    clock = VirtualClock()
+    scheduler = Scheduler(clock)
+    engine = make_engine(clock, scheduler)
+    events = []
+
+    def on_event(event, data):
+        events.append((clock.now, event, data))
+        if event == "time_exceeded":
+            # What the apps do on time_exceeded
+            engine.stop_speaker(data["name"])
+    engine.subscribe(on_event)
+    for u in utterances:
+        if u.speaker and u.speaker not in moderators and u.speaker not in engine.participants:
+            engine.add_participant(u.speaker, allocated_seconds)
+    if not engine.participants:
+        return ReplayResult(engine, events, 0.0, 0)
+    engine.start_meeting()
+
+    turn = None
+    fed = 0
+    for u in utterances:
+        run_clock_to(scheduler, clock, u.start)
+        if cues and u.speaker != turn:
+            if turn in engine.participants:
+                engine.handle_utterance(STOP_CUE)
+                fed += 1
+            if u.speaker in engine.participants:
+                engine.handle_utterance(START_CUE.format(name=u.speaker))
+                fed += 1
+            turn = u.speaker
+        engine.handle_utterance(u.text)
+        fed += 1
+    if utterances:
+        run_clock_to(scheduler, clock, utterances[-1].end)
+    if cues and turn in engine.participants:
+        engine.handle_utterance(STOP_CUE)
+        fed += 1
+    engine.end_meeting()
+    return ReplayResult(engine, events, clock.now, fed)
+
+def engine_factory(use_classifier):
+    detect, categorize_batch, tokenize = None, lambda lines, token_lists=None: ["today"] * len(lines), None
+    if use_classifier:
+        import classifiers
+        detect, categorize_batch, tokenize = classifiers.detect_start_stop, classifiers.categorize_statements, classifiers.tokenize
+
+    def make_engine(clock, scheduler):
+        return MeetingEngine(detect_start_stop=detect, categorize_batch=categorize_batch, tokenize=tokenize,
+                             clock=clock, scheduler=scheduler)
+    return make_engine
+
+def print_timeline(result):
+    for t, event, data in result.events:
+        details = ", ".join(f"{k}={v.name if hasattr(v, 'name') else v}" for k, v in data.items() if k != "tokens")
+        print(f"  {int(t // 60):02d}:{t % 60:05.2f}  {event:<20} {details}")
+    print(result.engine.summary_text())
+
+def main(args):
+    make_engine = engine_factory(not args.keywords_only)
+    meetings = []
+    for lines in load_meetings(args.source):
+        meetings.append(timestamp_lines(lines, args.wpm))
+        if args.meetings and len(meetings) >= args.meetings:
+            break
+    if not meetings:
+        print(f"No meetings found in {args.source}")
+        return
+
+    simulated = 0.0
+    utterances = exceeded = warnings = 0
+    start = time.perf_counter()
+    for i in range(args.repeat):
+        for j, meeting in enumerate(meetings):
+            result = replay_meeting(meeting, make_engine, args.alloc, cues=not args.no_cues)
+            result.engine.summary()
+            simulated += result.duration
+            utterances += result.utterances
+            exceeded += sum(1 for _, event, _ in result.events if event == "time_exceeded")
+            warnings += sum(1 for _, event, _ in result.events if event == "time_warning")
+            if args.timeline and i == 0 and j == 0:
+                print("Timeline of the first meeting:")
+                print_timeline(result)
+    elapsed = time.perf_counter() - start
+
+    n = len(meetings) * args.repeat
+    print(f"Replayed {n} meetings ({len(meetings)} distinct), {utterances} utterances")
+    print(f"Simulated meeting time: {simulated / 3600:.2f} h in {elapsed:.3f} s wall ({simulated / elapsed:,.0f}x real time)")
+    print(f"Meetings/sec: {n / elapsed:.1f}, utterances/sec: {utterances / elapsed:.1f}")
+    print(f"Time warnings: {warnings}, speakers over their {args.alloc:.0f}s allocation: {exceeded}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded meeting transcripts through MeetingEngine on a virtual clock.")
+    parser.add_argument("--source", default="category_labeled.csv",
+                        help="category_labeled.csv, a local MOM export (.csv/.jsonl/.parquet) or a dataset name")
+    parser.add_argument("--meetings", type=int, default=0, help="limit the number of distinct meetings (0 = all)")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the loaded meetings this many times")
+    parser.add_argument("--alloc", type=float, default=30, help="allocated seconds per participant")
+    parser.add_argument("--wpm", type=float, default=WORDS_PER_MINUTE, help="speaking rate for synthesized timestamps")
+    parser.add_argument("--no-cues", action="store_true", help="feed the transcript only, without start/stop phrases")
+    parser.add_argument("--keywords-only", action="store_true", help="skip the start/stop and category classifiers")
+    parser.add_argument("--timeline", action="store_true", help="print the event timeline of the first meeting")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    main(args)
@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+class Timer:
+    __slots__ = ("deadline", "seq", "callback", "cancelled")
+
+    def __init__(self, deadline, seq, callback):
+        self.deadline = deadline
+        self.seq = seq
+        self.callback = callback
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+    def cancel(self):
+        # O(1): the heap entry is skipped when it reaches the top
+        self.cancelled = True
+
+class Scheduler:
+    """One deadline heap for every speaker timer in the process.
+
+    With start() a single thread sleeps until the earliest deadline and runs
+    the callbacks that are due. Without it, the owner drives the heap by
+    calling run_due(), which is how replays on a virtual clock use it.
+    Cancelled timers stay in the heap until popped or until they make up
+    half of it, at which point the heap is rebuilt without them.
+    """
+
+    def __init__(self, clock=time.time):
+        self.clock = clock
+        self.heap = []
+        self.counter = itertools.count()
+        self.cancelled = 0
+        self.cond = threading.Condition()
+        self.thread = None
+        self.running = False
+
+    def call_at(self, deadline, callback):
+        with self.cond:
+            timer = Timer(deadline, next(self.counter), callback)
+            heapq.heappush(self.heap, timer)
+            if self.heap[0] is timer:
+                self.cond.notify()
+            return timer
+
+    def call_later(self, delay, callback):
+        return self.call_at(self.clock() + delay, callback)
+
+    def cancel(self, timer):
+        with self.cond:
+            if timer.cancelled:
+                return
+            timer.cancel()
+            self.cancelled += 1
+            if self.cancelled > 64 and self.cancelled * 2 > len(self.heap):
+                self.heap = [t for t in self.heap if not t.cancelled]
+                heapq.heapify(self.heap)
+                self.cancelled = 0
+
+    def _pop_cancelled(self):
+        while self.heap and self.heap[0].cancelled:
+            heapq.heappop(self.heap)
+            self.cancelled -= 1
+
+    def next_deadline(self):
+        with self.cond:
+            self._pop_cancelled()
+            return self.heap[0].deadline if self.heap else None
+
+    def __len__(self):
+        return len(self.heap) - self.cancelled
+
+    def run_due(self, now=None):
+        """Run every timer whose deadline is <= now; return how many ran."""
+        if now is None:
+            now = self.clock()
+        ran = 0
+        while True:
+            with self.cond:
+                self._pop_cancelled()
+                if not self.heap or self.heap[0].deadline > now:
+                    return ran
+                timer = heapq.heappop(self.heap)
+                # Mark it so a late cancel() does not count it twice
+                timer.cancelled = True
+            try:
+                timer.callback()
+            except Exception as e:
+                logging.error(f"Timer callback error: {e}")
+            ran += 1
+
+    def start(self):
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join(timeout=2)
+
+    def _run(self):
+        while True:
+            with self.cond:
+                if not self.running:
+                    return
+                self._pop_cancelled()
+                timeout = None if not self.heap else max(0.0, self.heap[0].deadline - self.clock())
+                if timeout is None or timeout > 0:
+                    self.cond.wait(timeout)
+                    continue
+            self.run_due()
@@ -0,0 +1,261 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+
+import numpy as np
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+EMBEDDING_CACHE_PATH = "embedding_cache.sqlite3"
+# Written by export_onnx_embedding.py
+ONNX_MODEL_DIR = os.path.join("onnx", MODEL_NAME)
+# "torch", "onnx", or "auto" (onnx when an exported model exists)
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "auto")
+
+def normalize_text(text):
+    return " ".join(text.lower().split())
+
+def text_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """Embeddings keyed by normalized text: an in-memory LRU in front of an
+    on-disk sqlite store keyed by (model name, text hash).
+
+    encode() only sends texts that are in neither layer to the model, as one
+    batch, so repeated reports and recurring phrases cost a dictionary lookup.
+    """
+
+    def __init__(self, model_name, encode_batch, path=EMBEDDING_CACHE_PATH, maxsize=4096):
+        self.model_name = model_name
+        self.encode_batch = encode_batch
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = 0
+        self.db = None
+        if path:
+            self.db = sqlite3.connect(path, check_same_thread=False)
+            self.db.execute("CREATE TABLE IF NOT EXISTS embeddings "
+                            "(model TEXT, key TEXT, dim INTEGER, vector BLOB, PRIMARY KEY (model, key))")
+            self.db.commit()
+
+    def _remember(self, key, vector):
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def _load_from_disk(self, keys):
+        found = {}
+        if self.db is None or not keys:
+            return found
+        keys = list(keys)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self.db.execute(
+                f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(chunk))})",
+                [self.model_name] + chunk).fetchall()
+            for key, blob in rows:
+                found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def encode(self, texts):
+        normalized = [normalize_text(text) for text in texts]
+        keys = [text_key(text) for text in normalized]
+        with self.lock:
+            vectors = {}
+            for key in keys:
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    vectors[key] = self.memory[key]
+            self.hits += len(vectors)
+
+            missing = {key: text for key, text in zip(keys, normalized) if key not in vectors}
+            for key, vector in self._load_from_disk(missing).items():
+                vectors[key] = vector
+                self._remember(key, vector)
+                del missing[key]
+                self.disk_hits += 1
+
+            if missing:
+                self.misses += len(missing)
+                logging.debug(f"Encoding {len(missing)} uncached texts with {self.model_name}")
+                encoded = np.asarray(self.encode_batch(list(missing.values())), dtype=np.float32)
+                rows = []
+                for key, vector in zip(missing, encoded):
+                    vectors[key] = vector
+                    self._remember(key, vector)
+                    rows.append((self.model_name, key, len(vector), vector.tobytes()))
+                if self.db is not None:
+                    self.db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)", rows)
+                    self.db.commit()
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack([vectors[key] for key in keys])
+
+def cosine_similarity(a, b):
+    a = a / np.maximum(np.linalg.norm(a, axis=1, keepdims=True), 1e-12)
+    b = b / np.maximum(np.linalg.norm(b, axis=1, keepdims=True), 1e-12)
+    return a @ b.T
+
+def similarity_report(participants, agenda, cache):
+    owners, lines = [], []
+    for name, pdata in participants.items():
+        owners.extend([name] * len(pdata["spoken_lines"]))
+        lines.extend(pdata["spoken_lines"])
+    if not lines:
+        return "No statements to analyze."
+
+    # One batched lookup for every statement; only unseen lines reach the model
+    sims = cosine_similarity(cache.encode(lines), cache.encode(agenda))
+    report = ""
+    previous = None
+    for name, line, row in zip(owners, lines, sims):
+        if name != previous:
+            report += f"\n{name.capitalize()}:\n"
+            previous = name
+        best_idx = int(row.argmax())
+        report += f'  - "{line}" (agenda: "{agenda[best_idx]}", similarity: {row[best_idx]:.2f})\n'
+    return report
+
+class TorchBackend:
+    # Full-precision sentence-transformers model
+    def __init__(self, model_name=MODEL_NAME):
+        from sentence_transformers import SentenceTransformer
+        self.model = SentenceTransformer(model_name)
+        self.cache_name = model_name
+
+    def encode(self, texts):
+        return self.model.encode(list(texts), convert_to_numpy=True)
+
+class OnnxBackend:
+    """int8-quantized ONNX export of the same model on onnxruntime.
+
+    Reproduces the sentence-transformers pipeline (mean pooling over the
+    attention mask, then L2 normalization). Batches are formed dynamically:
+    texts are sorted by token length and each batch is padded only to its
+    own longest member, so short standup lines are not padded to long ones.
+    """
+
+    def __init__(self, model_dir=ONNX_MODEL_DIR, quantized=True, batch_size=32, max_length=256, threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.no_padding()
+        self.tokenizer.enable_truncation(max_length)
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        model_file = "model-int8.onnx" if quantized else "model.onnx"
+        self.session = ort.InferenceSession(os.path.join(model_dir, model_file), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.batch_size = batch_size
+        self.cache_name = f"{MODEL_NAME}:onnx-{'int8' if quantized else 'fp32'}"
+
+    def encode(self, texts):
+        encodings = self.tokenizer.encode_batch(list(texts))
+        order = sorted(range(len(encodings)), key=lambda i: len(encodings[i].ids))
+        results = [None] * len(encodings)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            width = max(len(encodings[i].ids) for i in batch)
+            ids = np.zeros((len(batch), width), dtype=np.int64)
+            mask = np.zeros((len(batch), width), dtype=np.int64)
+            types = np.zeros((len(batch), width), dtype=np.int64)
+            for row, i in enumerate(batch):
+                n = len(encodings[i].ids)
+                ids[row, :n] = encodings[i].ids
+                mask[row, :n] = encodings[i].attention_mask
+                types[row, :n] = encodings[i].type_ids
+            feeds = {"input_ids": ids, "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = types
+            hidden = self.session.run(None, feeds)[0]
+            weights = mask[:, :, None].astype(np.float32)
+            pooled = (hidden * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+            pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+            for row, i in enumerate(batch):
+                results[i] = pooled[row]
+        if not results:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(results)
+
+def load_backend(name=EMBEDDING_BACKEND):
+    if name == "auto":
+        name = "onnx" if os.path.exists(os.path.join(ONNX_MODEL_DIR, "model-int8.onnx")) else "torch"
+    if name == "onnx":
+        return OnnxBackend()
+    if name == "onnx-fp32":
+        return OnnxBackend(quantized=False)
+    if name == "torch":
+        return TorchBackend()
+    raise ValueError(f"Unknown embedding backend: {name}")
+
+class ModelState(Enum):
+    LOADING = 1
+    READY = 2
+    FAILED = 3
+
+class EmbeddingService:
+    """Loads the embedding model on a background thread.
+
+    state moves LOADING -> READY (or FAILED); on_state_change(state) is
+    called from the loader thread. Until READY, report() returns a short
+    notice instead of blocking the caller on the model load.
+    """
+
+    def __init__(self, agenda, backend=EMBEDDING_BACKEND, cache_path=EMBEDDING_CACHE_PATH, on_state_change=None):
+        self.agenda = agenda
+        self.backend_name = backend
+        self.cache_path = cache_path
+        self.on_state_change = on_state_change
+        self.state = ModelState.LOADING
+        self.error = None
+        self.backend = None
+        self.cache = None
+        self.ready = threading.Event()
+        threading.Thread(target=self._load, daemon=True).start()
+
+    def _set_state(self, state):
+        self.state = state
+        if state != ModelState.LOADING:
+            self.ready.set()
+        if self.on_state_change:
+            self.on_state_change(state)
+
+    def _load(self):
+        try:
+            t0 = time.perf_counter()
+            self.backend = load_backend(self.backend_name)
+            # Warm-up pass so the first real report does not pay first-call allocation costs
+            self.backend.encode(["warm up the embedding model"])
+            # Backends produce slightly different vectors, so each gets its own cache namespace
+            self.cache = EmbeddingCache(self.backend.cache_name, self.backend.encode, path=self.cache_path)
+            self.cache.encode(self.agenda)
+            logging.debug(f"Embedding backend {self.backend.cache_name} ready in {time.perf_counter() - t0:.2f}s")
+            self._set_state(ModelState.READY)
+        except Exception as e:
+            logging.error(f"Failed to load embedding backend {self.backend_name}: {e}")
+            self.error = e
+            self._set_state(ModelState.FAILED)
+
+    def status_text(self):
+        if self.state == ModelState.LOADING:
+            return "Similarity model: loading..."
+        if self.state == ModelState.FAILED:
+            return f"Similarity model: unavailable ({self.error})"
+        return "Similarity model: ready"
+
+    def report(self, participants):
+        if self.state == ModelState.LOADING:
+            return "The similarity model is still loading; try again in a moment."
+        if self.state == ModelState.FAILED:
+            return f"Similarity report unavailable: {self.error}"
+        return similarity_report(participants, self.agenda, self.cache)
@@ -0,0 +1,173 @@
+import itertools
+import logging
+import time
+import zlib
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from model_artifact import export_model
+
+# Out-of-core training: the labeled CSV is read CHUNK_ROWS rows at a time,
+# hashed into a fixed-size feature space (nothing is fitted, so there is no
+# vocabulary to hold in memory) and fed to SGDClassifier.partial_fit. Memory
+# is bounded by one chunk and the weight matrix, whatever the size of the file.
+CHUNK_ROWS = 20000
+N_FEATURES = 2 ** 18
+EPOCHS = 5
+FOLDS = 5
+TEST_FOLD = 0
+PARAM_GRID = {
+    "alpha": [1e-6, 1e-5, 1e-4],
+    "penalty": ["l2", "elasticnet"],
+}
+
+def add_arguments(parser):
+    group = parser.add_argument_group("streaming training")
+    group.add_argument("--streaming", action="store_true",
+                       help="Hashed features + SGD over mini-batches, with a parallel CV grid search")
+    group.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="Rows read and trained on per mini-batch")
+    group.add_argument("--n-features", type=int, default=N_FEATURES, help="Size of the hashed feature space")
+    group.add_argument("--epochs", type=int, default=EPOCHS, help="Passes over the training data")
+    group.add_argument("--folds", type=int, default=FOLDS, help="Folds; one is held out for the final test")
+    group.add_argument("--jobs", type=int, default=-1, help="Parallel search jobs (-1 = all cores)")
+
+def make_vectorizer(n_features=N_FEATURES):
+    # Same tokenizer defaults as the TfidfVectorizer the batch scripts use
+    return HashingVectorizer(n_features=n_features, alternate_sign=False, norm="l2")
+
+def make_classifier(params):
+    return SGDClassifier(loss="log_loss", random_state=42, **params)
+
+def param_grid(grid=PARAM_GRID):
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+def assign_folds(texts, folds):
+    # Folds are a hash of the text, so every pass (and every worker) agrees on
+    # them without storing an index, and duplicate lines never straddle folds
+    return np.fromiter((zlib.crc32(text.encode("utf-8")) % folds for text in texts), dtype=np.int64,
+                       count=len(texts))
+
+def iter_chunks(sources, chunk_rows=CHUNK_ROWS, columns=("text", "label")):
+    # sources: CSV paths, or small in-memory DataFrames such as the moderator corrections
+    for source in sources:
+        if isinstance(source, pd.DataFrame):
+            for start in range(0, len(source), chunk_rows):
+                yield source.iloc[start:start + chunk_rows][list(columns)]
+            continue
+        for chunk in pd.read_csv(source, chunksize=chunk_rows, usecols=list(columns), dtype=str,
+                                 keep_default_na=False):
+            yield chunk
+
+def read_classes(sources, chunk_rows=CHUNK_ROWS):
+    # partial_fit needs every class up front; one cheap pass over the label column
+    labels = set()
+    for chunk in iter_chunks(sources, chunk_rows, columns=("label",)):
+        labels.update(chunk["label"])
+    return np.array(sorted(labels))
+
+def iter_batches(sources, vectorizer, folds, keep, chunk_rows=CHUNK_ROWS, rng=None):
+    """Yield (X, y) per chunk for the rows whose fold is in keep, shuffled within the chunk if rng is given."""
+    for chunk in iter_chunks(sources, chunk_rows):
+        texts = chunk["text"].to_numpy()
+        labels = chunk["label"].to_numpy()
+        mask = np.isin(assign_folds(texts, folds), list(keep))
+        texts, labels = texts[mask], labels[mask]
+        if len(texts) == 0:
+            continue
+        if rng is not None:
+            order = rng.permutation(len(texts))
+            texts, labels = texts[order], labels[order]
+        yield vectorizer.transform(texts), labels
+
+def fit_streaming(sources, params, classes, train_folds, folds, n_features=N_FEATURES, epochs=EPOCHS,
+                  chunk_rows=CHUNK_ROWS):
+    vectorizer = make_vectorizer(n_features)
+    clf = make_classifier(params)
+    rng = np.random.default_rng(42)
+    for _ in range(epochs):
+        for X, y in iter_batches(sources, vectorizer, folds, train_folds, chunk_rows, rng):
+            clf.partial_fit(X, y, classes=classes)
+    return vectorizer, clf
+
+def confusion_streaming(sources, vectorizer, clf, classes, eval_folds, folds, chunk_rows=CHUNK_ROWS):
+    # Confusion counts accumulated per chunk; predictions are never all in memory
+    index = {label: i for i, label in enumerate(classes)}
+    confusion = np.zeros((len(classes), len(classes)), dtype=np.int64)
+    for X, y in iter_batches(sources, vectorizer, folds, eval_folds, chunk_rows):
+        true = np.array([index[label] for label in y])
+        pred = np.array([index[label] for label in clf.predict(X)])
+        np.add.at(confusion, (true, pred), 1)
+    return confusion
+
+def scores(confusion):
+    total = confusion.sum()
+    tp = np.diag(confusion).astype(float)
+    predicted = confusion.sum(axis=0)
+    actual = confusion.sum(axis=1)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, actual, out=np.zeros_like(tp), where=actual > 0)
+    f1 = np.divide(2 * precision * recall, precision + recall, out=np.zeros_like(tp), where=precision + recall > 0)
+    return {"accuracy": tp.sum() / total if total else 0.0, "macro_f1": float(f1[actual > 0].mean()) if total else 0.0}
+
+def _cv_job(sources, params, classes, train_folds, val_fold, folds, n_features, epochs, chunk_rows):
+    # One (candidate, fold) pair; runs in a worker process and streams the data itself
+    vectorizer, clf = fit_streaming(sources, params, classes, train_folds, folds, n_features, epochs, chunk_rows)
+    return confusion_streaming(sources, vectorizer, clf, classes, {val_fold}, folds, chunk_rows)
+
+def search(sources, classes, folds=FOLDS, test_fold=TEST_FOLD, n_features=N_FEATURES, epochs=EPOCHS,
+           chunk_rows=CHUNK_ROWS, n_jobs=-1, grid=PARAM_GRID):
+    """Cross-validated grid search over the non-test folds; every (candidate, fold) fit runs in parallel.
+
+    Returns [(mean macro-F1, mean accuracy, params)], best first.
+    """
+    candidates = param_grid(grid)
+    cv_folds = [fold for fold in range(folds) if fold != test_fold]
+    jobs = [(params, fold) for params in candidates for fold in cv_folds]
+    logging.info(f"Grid search: {len(candidates)} candidates x {len(cv_folds)} folds")
+    confusions = joblib.Parallel(n_jobs=n_jobs)(
+        joblib.delayed(_cv_job)(sources, params, classes, set(cv_folds) - {fold}, fold, folds, n_features, epochs,
+                                chunk_rows)
+        for params, fold in jobs)
+    results = []
+    for i, params in enumerate(candidates):
+        fold_scores = [scores(c) for c in confusions[i * len(cv_folds):(i + 1) * len(cv_folds)]]
+        results.append((np.mean([s["macro_f1"] for s in fold_scores]),
+                        np.mean([s["accuracy"] for s in fold_scores]), params))
+    results.sort(key=lambda r: -r[0])
+    return results
+
+def train(args, vectorizer_path, clf_path, artifact_path, extra=None, corrections=None):
+    """Search, fit and save; extra is a DataFrame of additional (text, label) rows.
+
+    corrections is the correction-log record count recorded in the artifact.
+    """
+    start = time.perf_counter()
+    sources = [args.data] if extra is None or extra.empty else [args.data, extra]
+    classes = read_classes(sources, args.chunk_rows)
+    print(f"Classes: {', '.join(classes)}")
+    if args.folds < 3:
+        raise SystemExit("--folds must be at least 3 (one test fold, two or more for cross-validation)")
+
+    results = search(sources, classes, args.folds, TEST_FOLD, args.n_features, args.epochs, args.chunk_rows,
+                     args.jobs)
+    print(f"{'macro-F1':>9} {'accuracy':>9}  params")
+    for f1, acc, params in results:
+        print(f"{f1:9.3f} {acc:9.3f}  {params}")
+    best = results[0][2]
+
+    train_folds = {fold for fold in range(args.folds) if fold != TEST_FOLD}
+    vectorizer, clf = fit_streaming(sources, best, classes, train_folds, args.folds, args.n_features,
+                                    args.epochs, args.chunk_rows)
+    test = scores(confusion_streaming(sources, vectorizer, clf, classes, {TEST_FOLD}, args.folds,
+                                      args.chunk_rows))
+    print(f"Held-out fold with {best}: accuracy {test['accuracy']:.3f}, macro-F1 {test['macro_f1']:.3f}")
+    print(f"Trained in {time.perf_counter() - start:.1f} s")
+
+    joblib.dump(vectorizer, vectorizer_path)
+    joblib.dump(clf, clf_path)
+    export_model(vectorizer, clf, artifact_path, corrections=corrections)
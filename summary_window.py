@@ -0,0 +1,99 @@
+import logging
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+from classifiers import correct_category, correct_start_stop, get_models
+from meeting_engine import CATEGORIES
+
+class SummaryWindow:
+    """Meeting summary with one row per statement, where the moderator can fix labels.
+
+    A category correction moves the statement in the live summary and, like
+    a start/stop correction, is applied to the running model at once and
+    appended to the corrections log that the training scripts fold in.
+    """
+
+    def __init__(self, root, live_summary):
+        self.live_summary = live_summary
+        self.window = tk.Toplevel(root)
+        self.window.title("Meeting Summary")
+        self.window.geometry("900x500")
+        self.window.columnconfigure(0, weight=1)
+        self.window.rowconfigure(0, weight=1)
+        frame = ttk.Frame(self.window, padding="10")
+        frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        frame.columnconfigure(1, weight=1)
+        frame.rowconfigure(0, weight=1)
+
+        self.tree = ttk.Treeview(frame, columns=('Name', 'Category', 'Statement'), show='headings')
+        self.tree.heading('Name', text='Name')
+        self.tree.heading('Category', text='Category')
+        self.tree.heading('Statement', text='Statement')
+        self.tree.column('Name', width=100, stretch=False)
+        self.tree.column('Category', width=100, stretch=False)
+        self.tree.grid(column=0, row=0, columnspan=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        ttk.Label(frame, text="Category:").grid(column=0, row=1, sticky=tk.W, pady=(10,0))
+        self.category_var = tk.StringVar()
+        ttk.Combobox(frame, textvariable=self.category_var, values=list(CATEGORIES), state="readonly",
+                     width=15).grid(column=1, row=1, sticky=tk.W, pady=(10,0))
+        ttk.Button(frame, text="Correct Category", command=self.apply_category).grid(column=2, row=1, pady=(10,0))
+        ttk.Label(frame, text="Start/Stop:").grid(column=0, row=2, sticky=tk.W, pady=5)
+        self.start_stop_var = tk.StringVar()
+        ttk.Combobox(frame, textvariable=self.start_stop_var, values=get_models()[1].classes, state="readonly",
+                     width=15).grid(column=1, row=2, sticky=tk.W, pady=5)
+        ttk.Button(frame, text="Correct Start/Stop", command=self.apply_start_stop).grid(column=2, row=2, pady=5)
+        self.status_var = tk.StringVar()
+        ttk.Label(frame, textvariable=self.status_var).grid(column=0, row=3, columnspan=5, sticky=tk.W)
+        self.tree.bind("<<TreeviewSelect>>", self.on_select)
+        self.refresh()
+
+    def refresh(self):
+        self.tree.delete(*self.tree.get_children())
+        self.statements = {}
+        for name, _, categorized in self.live_summary.summary():
+            for cat in CATEGORIES:
+                for line in categorized[cat]:
+                    iid = self.tree.insert('', 'end', values=(name.capitalize(), cat, line))
+                    self.statements[iid] = (name, cat, line)
+
+    def selected(self):
+        selection = self.tree.selection()
+        if not selection:
+            messagebox.showwarning("Warning", "Select a statement first.", parent=self.window)
+            return None
+        return self.statements[selection[0]]
+
+    def on_select(self, event=None):
+        selection = self.tree.selection()
+        if selection:
+            _, cat, line = self.statements[selection[0]]
+            self.category_var.set(cat)
+            self.start_stop_var.set(get_models()[1].predict([get_models()[1].tokenize(line)])[0])
+
+    def apply_category(self):
+        item, label = self.selected(), self.category_var.get()
+        if not item or not label or label == item[1]:
+            return
+        name, _, line = item
+        try:
+            correct_category(line, label)
+        except (OSError, ValueError) as e:
+            logging.error(f"Category correction failed: {e}")
+            messagebox.showerror("Error", f"Could not apply the correction: {e}", parent=self.window)
+            return
+        self.live_summary.recategorize(name, line, label)
+        self.status_var.set(f"Moved to {label} and updated the category model.")
+        self.refresh()
+
+    def apply_start_stop(self):
+        item, label = self.selected(), self.start_stop_var.get()
+        if not item or not label:
+            return
+        try:
+            correct_start_stop(item[2], label)
+        except (OSError, ValueError) as e:
+            logging.error(f"Start/stop correction failed: {e}")
+            messagebox.showerror("Error", f"Could not apply the correction: {e}", parent=self.window)
+            return
+        self.status_var.set(f"Updated the start/stop model: this statement is now '{label}'.")
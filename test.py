@@ -1,23 +1,24 @@
-import pandas as pd
-import ast
-from datasets import load_dataset
 import random
+import sys
 
-# Load the MOM-Summary-Dataset
-mom_dataset = load_dataset("sasvata/MOM-Summary-Dataset")
-mom_meetings = mom_dataset['train']
+from transcripts import MOM_DATASET, iter_transcripts
 
-lines = []
-N = len(mom_meetings)
-for i in range(N):
-    mt_raw = mom_meetings[i]['Meeting Transcript']
-    try:
-        mt_dict = ast.literal_eval(mt_raw)
-        transcript = mt_dict.get('transcript', [])
-        lines.extend(transcript)
-    except Exception as e:
-        print(f"Error parsing row {i}: {e}")
+# Print a random sample of 20 transcript lines from the MOM-Summary-Dataset or a local snapshot of it
+source = sys.argv[1] if len(sys.argv) > 1 else MOM_DATASET
 
-print("Random sample of 20 lines:")
-for line in random.sample(lines, 20):
+# Reservoir sampling, so the corpus is streamed rather than held in memory
+sample = []
+seen = 0
+for lines, _ in iter_transcripts(source):
+    for line in lines:
+        seen += 1
+        if len(sample) < 20:
+            sample.append(line)
+        else:
+            j = random.randrange(seen)
+            if j < 20:
+                sample[j] = line
+
+print(f"Random sample of 20 lines (of {seen}):")
+for line in sample:
     print(line)
@@ -1,3 +1,6 @@
+import argparse
+import sys
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
@@ -5,7 +8,24 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report
 import joblib
 
-df = pd.read_csv("category_labeled.csv")
+from model_artifact import export_model
+from online_learning import corrections_frame, count_corrections
+import streaming_training
+
+parser = argparse.ArgumentParser(description="Train the category classifier")
+parser.add_argument("--data", default="category_labeled.csv", help="Labeled CSV with text and label columns")
+streaming_training.add_arguments(parser)
+args = parser.parse_args()
+# Counted before reading them, so a correction logged meanwhile is replayed rather than lost
+corrections_seen = count_corrections()
+
+if args.streaming:
+    streaming_training.train(args, "category_vectorizer.joblib", "category_classifier.joblib", "category_model.bin",
+                             extra=corrections_frame("category"), corrections=corrections_seen)
+    sys.exit()
+
+# Moderator corrections from the summary window are training data too
+df = pd.concat([pd.read_csv(args.data), corrections_frame("category")], ignore_index=True)
 
 train_df, test_df = train_test_split(df, test_size=0.2, random_state=42, stratify=df['label'])
 vectorizer = TfidfVectorizer(max_features=5000)
@@ -20,3 +40,5 @@ print(classification_report(test_df['label'], y_pred))
 
 joblib.dump(vectorizer, "category_vectorizer.joblib")
 joblib.dump(clf, "category_classifier.joblib")
+# Pickle-free, memory-mappable copy used by the apps at runtime
+export_model(vectorizer, clf, "category_model.bin", corrections=corrections_seen)
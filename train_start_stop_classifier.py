@@ -1,11 +1,31 @@
+import argparse
+import sys
+
 import pandas as pd
 from sklearn.model_selection import train_test_split
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 import joblib
 
+from model_artifact import export_model
+from online_learning import corrections_frame, count_corrections
+import streaming_training
+
+parser = argparse.ArgumentParser(description="Train the start/stop classifier")
+parser.add_argument("--data", default="start_stop_labeled.csv", help="Labeled CSV with text and label columns")
+streaming_training.add_arguments(parser)
+args = parser.parse_args()
+# Counted before reading them, so a correction logged meanwhile is replayed rather than lost
+corrections_seen = count_corrections()
+
+if args.streaming:
+    streaming_training.train(args, "startstop_vectorizer.joblib", "startstop_classifier.joblib", "startstop_model.bin",
+                             extra=corrections_frame("startstop"), corrections=corrections_seen)
+    sys.exit()
+
 # Load labeled data
-df = pd.read_csv("start_stop_labeled.csv")
+# Moderator corrections from the summary window are training data too
+df = pd.concat([pd.read_csv(args.data), corrections_frame("startstop")], ignore_index=True)
 
 X = df['text']
 y = df['label']
@@ -34,3 +54,5 @@ print("Test accuracy:", clf.score(X_test_vec, y_test))
 # Save
 joblib.dump(vectorizer, "startstop_vectorizer.joblib")
 joblib.dump(clf, "startstop_classifier.joblib")
+# Pickle-free, memory-mappable copy used by the apps at runtime
+export_model(vectorizer, clf, "startstop_model.bin", corrections=corrections_seen)
@@ -0,0 +1,186 @@
+import ast
+import collections
+import csv
+import glob
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+
+MOM_DATASET = "sasvata/MOM-Summary-Dataset"
+TRANSCRIPT_COLUMN = "Meeting Transcript"
+PARSE_CACHE_PATH = "transcript_cache.sqlite3"
+EXTENSIONS = (".parquet", ".arrow", ".jsonl", ".json", ".csv")
+
+def parse_transcript(raw):
+    return ast.literal_eval(raw).get("transcript", [])
+
+def _iter_arrow_batches(path, column, batch_size):
+    import pyarrow as pa
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size, columns=[column])
+        return
+    # datasets' cache files are Arrow IPC streams; exported .arrow files may be the file format
+    source = pa.memory_map(path)
+    try:
+        reader = pa.ipc.open_stream(source)
+    except pa.ArrowInvalid:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            yield reader.get_batch(i).select([column])
+        return
+    for batch in reader:
+        yield batch.select([column])
+
+def iter_raw_transcripts(source, column=TRANSCRIPT_COLUMN, batch_size=1024):
+    """Stream raw transcript strings from local snapshots, one file at a time.
+
+    source may be a .parquet, .arrow, .jsonl/.json or .csv file, a directory
+    of them, or a dataset name (streamed through datasets as a fallback).
+    Arrow and Parquet are read a record batch at a time.
+    """
+    if os.path.isdir(source):
+        paths = sorted(p for p in glob.glob(os.path.join(source, "**", "*"), recursive=True) if p.endswith(EXTENSIONS))
+    elif os.path.exists(source):
+        paths = [source]
+    else:
+        from datasets import load_dataset
+        for row in load_dataset(source, split="train", streaming=True):
+            yield row[column]
+        return
+
+    for path in paths:
+        if path.endswith((".parquet", ".arrow")):
+            for batch in _iter_arrow_batches(path, column, batch_size):
+                yield from batch.column(0).to_pylist()
+        elif path.endswith((".jsonl", ".json")):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)[column]
+        else:
+            csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    yield row[column]
+
+class ParseCache:
+    """Parsed transcripts in sqlite, keyed by the hash of the raw text.
+
+    Re-labeling the same snapshot, or a new snapshot that shares most of its
+    meetings with the old one, skips ast.literal_eval for every cached row.
+    """
+
+    def __init__(self, path=PARSE_CACHE_PATH):
+        self.db = sqlite3.connect(path)
+        self.db.execute("CREATE TABLE IF NOT EXISTS transcripts (key TEXT PRIMARY KEY, lines TEXT)")
+        self.db.commit()
+
+    @staticmethod
+    def key(raw):
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get_many(self, keys):
+        found = {}
+        keys = list(keys)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = self.db.execute(f"SELECT key, lines FROM transcripts WHERE key IN ({','.join('?' * len(chunk))})",
+                                   chunk).fetchall()
+            found.update((key, json.loads(lines)) for key, lines in rows)
+        return found
+
+    def put_many(self, items):
+        self.db.executemany("INSERT OR REPLACE INTO transcripts VALUES (?, ?)",
+                            [(key, json.dumps(lines)) for key, lines in items])
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+def _process_chunk(args):
+    # Worker: parse whatever is not cached yet, then label every line
+    labeler, items = args
+    results = []
+    for key, raw, lines in items:
+        error = None
+        if lines is None:
+            try:
+                lines = parse_transcript(raw)
+            except Exception as e:
+                lines, error = [], str(e)
+        labels = [labeler(line) for line in lines] if labeler else None
+        results.append((key, lines, labels, error, raw is not None))
+    return results
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_transcripts(source, labeler=None, processes=None, chunk_size=64, cache_path=PARSE_CACHE_PATH):
+    """Yield (lines, labels) per meeting, in input order.
+
+    Parsing and labeling run in a process pool with at most two chunks in
+    flight per worker, so memory stays bounded however large the corpus is.
+    labels is None without a labeler; labeler must be a module-level function.
+    """
+    cache = ParseCache(cache_path) if cache_path else None
+    processes = processes or os.cpu_count() or 1
+
+    def tasks():
+        for chunk in _chunks(iter_raw_transcripts(source), chunk_size):
+            keys = [ParseCache.key(raw) for raw in chunk]
+            cached = cache.get_many(keys) if cache else {}
+            yield labeler, [(key, None, cached[key]) if key in cached else (key, raw, None)
+                            for key, raw in zip(keys, chunk)]
+
+    with multiprocessing.Pool(processes) as pool:
+        pending = collections.deque()
+        task_iter = tasks()
+        done = False
+        while pending or not done:
+            while not done and len(pending) < processes * 2:
+                task = next(task_iter, None)
+                if task is None:
+                    done = True
+                else:
+                    pending.append(pool.apply_async(_process_chunk, (task,)))
+            if not pending:
+                break
+            results = pending.popleft().get()
+            if cache:
+                cache.put_many((key, lines) for key, lines, _, error, parsed in results if parsed and error is None)
+            for key, lines, labels, error, _ in results:
+                if error:
+                    logging.error(f"Error parsing transcript {key[:10]}: {error}")
+                    continue
+                yield lines, labels
+    if cache:
+        cache.close()
+
+def iter_labeled_lines(source, labeler, **kwargs):
+    for lines, labels in iter_transcripts(source, labeler, **kwargs):
+        yield from zip(lines, labels)
+
+def write_csv_chunked(rows, path, header=("text", "label"), chunk_rows=10000):
+    """Stream (text, label) rows to a CSV in chunks; return label counts."""
+    counts = collections.Counter()
+    tmp = path + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for chunk in _chunks(rows, chunk_rows):
+            writer.writerows(chunk)
+            counts.update(label for _, label in chunk)
+    os.replace(tmp, path)
+    return counts
@@ -0,0 +1,122 @@
+import hashlib
+import logging
+import os
+import queue
+import threading
+import time
+
+TTS_CACHE_DIR = "tts_cache"
+
+def announcement(event, name, fraction=None):
+    name = name.capitalize()
+    if event == "time_exceeded":
+        return f"{name}, your time is up. Please wrap it up."
+    if fraction is not None and fraction < 0.75:
+        return f"{name}, you are halfway through your time."
+    return f"{name}, your time is almost up."
+
+def meeting_announcements(names, warning_thresholds):
+    texts = []
+    for name in names:
+        texts.append(announcement("time_exceeded", name))
+        texts.extend(announcement("time_warning", name, fraction) for fraction in warning_thresholds)
+    return list(dict.fromkeys(texts))
+
+class TTSWorker:
+    """One long-lived pyttsx3 engine on its own thread, fed through a queue.
+
+    prerender() renders announcements to WAV files in cache_dir (kept across
+    meetings) and loads them into memory; say() returns immediately and,
+    when simpleaudio is installed and the text was pre-rendered, playback
+    starts without any synthesis. Anything else is synthesized live on the
+    worker thread, which never blocks the caller either.
+    """
+
+    def __init__(self, cache_dir=TTS_CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.requests = queue.Queue()
+        self.clips = {}
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+
+    def prerender(self, texts):
+        self._ensure_started()
+        self.requests.put(("render", list(texts), time.perf_counter()))
+
+    def say(self, text):
+        self._ensure_started()
+        self.requests.put(("say", text, time.perf_counter()))
+
+    def stop(self):
+        if self.thread is not None:
+            self.requests.put(None)
+            self.thread.join(timeout=2)
+
+    def clip_path(self, text):
+        return os.path.join(self.cache_dir, hashlib.sha1(text.encode("utf-8")).hexdigest() + ".wav")
+
+    def _run(self):
+        # pyttsx3 engines must be created and driven from a single thread
+        try:
+            import pyttsx3
+            engine = pyttsx3.init()
+        except Exception as e:
+            logging.error(f"TTS unavailable: {e}")
+            engine = None
+        try:
+            import simpleaudio
+        except ImportError:
+            simpleaudio = None
+            if engine is not None:
+                logging.warning("simpleaudio is not installed: announcement clips are disabled, "
+                                "nothing is pre-rendered and every announcement is synthesized live")
+
+        while True:
+            item = self.requests.get()
+            if item is None:
+                break
+            kind, payload, requested_at = item
+            try:
+                if kind == "render":
+                    self._render(engine, simpleaudio, payload)
+                elif kind == "say":
+                    self._say(engine, payload, requested_at)
+            except Exception as e:
+                logging.error(f"TTS error: {e}")
+
+    def _render(self, engine, simpleaudio, texts):
+        if engine is None or simpleaudio is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        missing = [text for text in texts if not os.path.exists(self.clip_path(text))]
+        for text in missing:
+            engine.save_to_file(text, self.clip_path(text))
+        if missing:
+            engine.runAndWait()
+        for text in texts:
+            if text in self.clips:
+                continue
+            try:
+                self.clips[text] = simpleaudio.WaveObject.from_wave_file(self.clip_path(text))
+            except Exception as e:
+                # Some drivers write AIFF or nothing at all; those texts are spoken live
+                logging.debug(f"Could not load pre-rendered clip for {text!r}: {e}")
+        logging.debug(f"Pre-rendered {len(self.clips)} announcements ({len(missing)} newly synthesized)")
+
+    def _say(self, engine, text, requested_at):
+        clip = self.clips.get(text)
+        if clip is None and engine is None:
+            return
+        logging.debug(f"TTS {'clip' if clip else 'live'} {(time.perf_counter() - requested_at) * 1000:.1f} ms "
+                      f"after request: {text}")
+        if clip is not None:
+            clip.play()
+        else:
+            engine.say(text)
+            engine.runAndWait()
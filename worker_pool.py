@@ -0,0 +1,310 @@
+import argparse
+import gc
+import logging
+import multiprocessing
+import os
+import queue
+import random
+import stat
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import classifiers
+from metrics import LatencyHistogram
+
+# A batch is sent as soon as BATCH_SIZE requests are queued or BATCH_WAIT seconds
+# after its first request, whichever comes first
+BATCH_SIZE = 64
+BATCH_WAIT = 0.001
+# Idle workers are pinged this often; a worker that does not answer a ping or
+# finish a batch within WORKER_TIMEOUT seconds is killed and re-forked
+HEALTH_CHECK_INTERVAL = 1.0
+WORKER_TIMEOUT = 10.0
+# A batch whose worker died is retried this many times on a fresh worker
+RETRIES = 1
+
+def _close_inherited_sockets(keep):
+    # A worker re-forked from a running server would otherwise hold its listening
+    # socket, client connections and the other workers' pipes open
+    try:
+        fds = [int(fd) for fd in os.listdir("/proc/self/fd")]
+    except OSError:
+        return
+    for fd in fds:
+        if fd == keep:
+            continue
+        try:
+            if stat.S_ISSOCK(os.fstat(fd).st_mode):
+                os.close(fd)
+        except OSError:
+            pass
+
+def _worker_main(conn, handlers):
+    # Runs in the forked child; the models were loaded by the parent and are shared copy-on-write
+    _close_inherited_sockets(conn.fileno())
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+        kind, items = message
+        if kind == "ping":
+            conn.send(("pong", None))
+            continue
+        try:
+            conn.send((handlers[kind](items), None))
+        except Exception as e:
+            conn.send((None, f"{type(e).__name__}: {e}"))
+
+class WorkerError(RuntimeError):
+    pass
+
+class Batch:
+    def __init__(self, kind, requests):
+        self.kind = kind
+        self.requests = requests
+        self.attempts = 0
+
+class Worker:
+    def __init__(self, process, conn, versions):
+        self.process = process
+        self.conn = conn
+        self.versions = versions
+
+class WorkerPool:
+    """Classification in pre-forked worker processes.
+
+    The models are loaded once in the parent, gc.freeze() moves every object
+    into the permanent generation so collections in the children never touch
+    (and so never copy) those pages, and the workers are forked from there.
+    Requests from any number of threads and meetings are queued and
+    micro-batched per kind; each worker has a feeder thread in the parent
+    that sends it batches, pings it when idle and re-forks it if it dies or
+    hangs. An online correction or a retrained model file changes
+    classifiers.model_versions(), and workers forked before it are re-forked
+    before their next batch.
+
+    detect_start_stop and categorize_statements have the classifiers module
+    signatures, so the pool plugs straight into MeetingEngine.
+    """
+
+    def __init__(self, workers=None, batch_size=BATCH_SIZE, batch_wait=BATCH_WAIT):
+        self.size = workers or os.cpu_count()
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.handlers = {
+            "startstop": classifiers.detect_start_stop_batch,
+            "category": classifiers.categorize_statements,
+        }
+        self.context = multiprocessing.get_context("fork")
+        self.requests = queue.Queue()
+        self.batches = queue.Queue()
+        self.workers = []
+        self.threads = []
+        self.lock = threading.Lock()
+        self.started = False
+        self.closed = False
+        self.batch_sizes = LatencyHistogram(min_seconds=1, max_seconds=10000, buckets_per_decade=10)
+        self.restarts = 0
+        self.failed = 0
+
+    def start(self):
+        with self.lock:
+            if self.started:
+                return
+            t0 = time.perf_counter()
+            versions = classifiers.model_versions()
+            self.workers = [self._fork(versions) for _ in range(self.size)]
+            self.threads = [threading.Thread(target=self._dispatch, daemon=True)]
+            self.threads += [threading.Thread(target=self._feed, args=(slot,), daemon=True) for slot in range(self.size)]
+            for thread in self.threads:
+                thread.start()
+            self.started = True
+            logging.info(f"Started {self.size} classifier workers in {time.perf_counter() - t0:.2f}s")
+
+    def _fork(self, versions):
+        parent_conn, child_conn = self.context.Pipe()
+        # Everything allocated so far, the models included, is never scanned by the children's collector
+        gc.collect()
+        gc.freeze()
+        process = self.context.Process(target=_worker_main, args=(child_conn, self.handlers), daemon=True)
+        process.start()
+        child_conn.close()
+        return Worker(process, parent_conn, versions)
+
+    def _restart(self, slot, reason):
+        worker = self.workers[slot]
+        logging.warning(f"Restarting classifier worker {worker.process.pid}: {reason}")
+        worker.conn.close()
+        worker.process.kill()
+        worker.process.join()
+        self.workers[slot] = self._fork(classifiers.model_versions())
+        self.restarts += 1
+
+    def close(self):
+        with self.lock:
+            if not self.started or self.closed:
+                return
+            self.closed = True
+        self.requests.put(None)
+        for thread in self.threads:
+            thread.join(timeout=WORKER_TIMEOUT)
+        for worker in self.workers:
+            worker.process.join(timeout=2)
+            if worker.process.is_alive():
+                worker.process.kill()
+
+    def submit(self, kind, item):
+        if not self.started:
+            self.start()
+        if self.closed:
+            raise WorkerError("The worker pool is closed")
+        future = Future()
+        self.requests.put((kind, item, future))
+        return future
+
+    def map(self, kind, items):
+        futures = [self.submit(kind, item) for item in items]
+        return [future.result() for future in futures]
+
+    def detect_start_stop(self, statement, tokens=None):
+        # Tokens are not sent; tokenizing in the worker is cheaper than pickling them
+        return self.submit("startstop", statement).result()
+
+    def categorize_statements(self, statements, token_lists=None):
+        return self.map("category", statements)
+
+    def _dispatch(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                break
+            pending = [request]
+            deadline = time.monotonic() + self.batch_wait
+            while len(pending) < self.batch_size:
+                try:
+                    request = self.requests.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    self.requests.put(None)
+                    break
+                pending.append(request)
+            by_kind = {}
+            for kind, item, future in pending:
+                by_kind.setdefault(kind, []).append((item, future))
+            for kind, requests in by_kind.items():
+                self.batches.put(Batch(kind, requests))
+        for _ in range(self.size):
+            self.batches.put(None)
+
+    def _feed(self, slot):
+        while True:
+            try:
+                batch = self.batches.get(timeout=HEALTH_CHECK_INTERVAL)
+            except queue.Empty:
+                if not self._healthy(self.workers[slot]):
+                    self._restart(slot, "failed a health check")
+                continue
+            if batch is None:
+                try:
+                    self.workers[slot].conn.send(None)
+                except OSError:
+                    pass
+                return
+            if self.workers[slot].versions != classifiers.model_versions():
+                self._restart(slot, "the models changed")
+            self._run(slot, batch)
+
+    def _healthy(self, worker):
+        if not worker.process.is_alive():
+            return False
+        try:
+            worker.conn.send(("ping", None))
+            return worker.conn.poll(WORKER_TIMEOUT) and worker.conn.recv()[0] == "pong"
+        except (EOFError, OSError):
+            return False
+
+    def _run(self, slot, batch):
+        items = [item for item, _ in batch.requests]
+        while True:
+            worker = self.workers[slot]
+            batch.attempts += 1
+            try:
+                worker.conn.send((batch.kind, items))
+                if not worker.conn.poll(WORKER_TIMEOUT):
+                    raise TimeoutError(f"no answer in {WORKER_TIMEOUT}s")
+                results, error = worker.conn.recv()
+                break
+            except (EOFError, OSError, TimeoutError) as e:
+                self._restart(slot, f"{batch.kind} batch of {len(items)} failed ({e or type(e).__name__})")
+                if batch.attempts > RETRIES:
+                    results, error = None, f"worker failed {batch.attempts} times: {e or type(e).__name__}"
+                    break
+        self.batch_sizes.record(len(items))
+        if error is not None:
+            self.failed += len(items)
+            for _, future in batch.requests:
+                future.set_exception(WorkerError(error))
+            return
+        for (_, future), result in zip(batch.requests, results):
+            future.set_result(result)
+
+    def stats(self):
+        s = self.batch_sizes.summary()
+        return {"workers": self.size, "alive": sum(1 for w in self.workers if w.process.is_alive()),
+                "batches": s["count"], "mean_batch": s["mean"], "restarts": self.restarts, "failed": self.failed}
+
+    def stats_text(self):
+        s = self.stats()
+        return (f"Classifier workers: {s['alive']}/{s['workers']} alive, {s['batches']} batches "
+                f"(mean {s['mean_batch']:.1f} statements), {s['restarts']} restarts, {s['failed']} failed")
+
+def benchmark_statements(n, seed=42):
+    # Pairs of labeled lines: realistic statements that all miss the result caches
+    import csv
+    with open("category_labeled.csv", newline="") as f:
+        lines = [row["text"] for row in csv.DictReader(f)]
+    rng = random.Random(seed)
+    return [f"{rng.choice(lines)} {rng.choice(lines)} {i}" for i in range(n)]
+
+def run_clients(classify, statements, clients):
+    # Every client thread is one meeting posting its utterances one at a time
+    chunks = [statements[i::clients] for i in range(clients)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(clients) as executor:
+        list(executor.map(lambda chunk: [classify(text) for text in chunk], chunks))
+    return len(statements) / (time.perf_counter() - start)
+
+def main(args):
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    classifiers.get_models()
+    print(f"{os.cpu_count()} CPUs, {args.clients} concurrent clients, {args.statements} statements per run")
+    statements = benchmark_statements(args.statements)
+    baseline = run_clients(classifiers.detect_start_stop, statements, args.clients)
+    print(f"  in-process        {baseline:9,.0f} statements/s")
+    for n, workers in enumerate(int(w) for w in args.workers.split(",")):
+        pool = WorkerPool(workers, args.batch_size, args.batch_wait)
+        pool.start()
+        # Fresh statements for every run, so no worker has them cached yet
+        statements = benchmark_statements(args.statements, seed=n + 1)
+        rate = run_clients(pool.detect_start_stop, statements, args.clients)
+        print(f"  {workers:2d} worker(s)      {rate:9,.0f} statements/s  {rate / baseline:5.2f}x  "
+              f"{pool.stats_text()}")
+        pool.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare start/stop classification throughput in-process "
+                                                 "and through forked worker pools of several sizes.")
+    parser.add_argument("--workers", default=",".join(str(2 ** i) for i in range(os.cpu_count().bit_length())),
+                        help="comma-separated pool sizes to try")
+    parser.add_argument("--clients", type=int, default=64, help="threads submitting statements at once")
+    parser.add_argument("--statements", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--batch-wait", type=float, default=BATCH_WAIT)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    main(args)